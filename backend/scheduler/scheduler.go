@@ -66,11 +66,15 @@ func main() {
 
 	schedules := []periodicSchedule{
 		{http.MethodPut, "/jobs/expire", []time.Duration{0 * time.Second, 15 * time.Minute, 30 * time.Minute, 45 * time.Minute, 60 * time.Minute}, interval},
-		{http.MethodPut, "/jobs/review", []time.Duration{30 * time.Second, 20 * time.Minute, 40 * time.Minute, 60 * time.Minute, 80 * time.Minute}, interval},
+		// nightly reviews go through the Batch API; results are picked up by the next day's /apps/create runs
+		{http.MethodPut, "/jobs/review?batch=true", []time.Duration{30 * time.Second, 20 * time.Minute, 40 * time.Minute, 60 * time.Minute, 80 * time.Minute}, interval},
 		{http.MethodPost, "/apps/create", []time.Duration{45 * time.Second, 21 * time.Minute, 41 * time.Minute, 61 * time.Minute, 81 * time.Minute}, interval},
 		{http.MethodPut, "/apps/prepare", []time.Duration{60 * time.Second, 22 * time.Minute, 42 * time.Minute, 62 * time.Minute, 82 * time.Minute}, interval},
 		{http.MethodPut, "/apps/submit", []time.Duration{5 * time.Minute, 25 * time.Minute}, time.Hour},
 		{http.MethodPost, "/jobs/find", []time.Duration{5 * time.Second}, interval},
+		{http.MethodPut, "/claims/reap", []time.Duration{10 * time.Second}, 15 * time.Minute},
+		{http.MethodPut, "/answers/cache/evict", []time.Duration{15 * time.Second}, interval},
+		{http.MethodPut, "/apps/embed", []time.Duration{20 * time.Second}, time.Hour},
 	}
 
 	// Start schedules
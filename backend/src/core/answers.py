@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+import redis
+from core.files import file_digest
+from core.metrics import record_cache_lookups
+from core.prompts import get_prompt_hash
+from db.cache import redis_client
+from schemas.definitions import AppField, Job, User
+
+ANSWER_CACHE_KEY = "answers:{digest}"
+# digest -> last used (unix time), for eviction
+ANSWER_CACHE_INDEX = "answers:index"
+
+# Entries unused for this long expire; 0 disables the cache
+ANSWER_CACHE_TTL_SECONDS = int(
+    os.getenv("ANSWER_CACHE_TTL_SECONDS", str(60 * 60 * 24 * 30))
+)
+# Least recently used entries beyond this are evicted
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "10000"))
+
+# Questions that ask about the company or role can't be answered the same way twice
+COMPANY_SPECIFIC_PATTERN = re.compile(
+    r"\b(why|our|we|this (company|role|position|team|job|opportunity))\b",
+    re.IGNORECASE,
+)
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def profile_hash(user: User) -> str:
+    """Hash of everything about the user that answers are derived from."""
+    digest = hashlib.sha256(user.to_prompt().encode())
+    if user.resume_pdf_path and os.path.exists(user.resume_pdf_path):
+        digest.update(file_digest(user.resume_pdf_path).encode())
+    return digest.hexdigest()
+
+
+def is_company_independent(field: AppField, job: Job) -> bool:
+    """Whether a question's answer doesn't depend on the company or role."""
+    question = field.question.lower()
+    if COMPANY_SPECIFIC_PATTERN.search(question):
+        return False
+    for name in (job.company, job.title):
+        if name and name.lower() in question:
+            return False
+    return True
+
+
+def answer_cache_key(field: AppField, user_hash: str) -> str:
+    template = "MC_FILLER" if field.multiple_choice else "TEXT_FILLER"
+    choices = (
+        sorted(normalize_question(choice) for choice in field.choices or [])
+        if field.multiple_choice
+        else None
+    )
+    digest = hashlib.sha256(
+        json.dumps(
+            [
+                normalize_question(field.question),
+                choices,
+                user_hash,
+                get_prompt_hash(template),
+            ]
+        ).encode()
+    ).hexdigest()
+    return ANSWER_CACHE_KEY.format(digest=digest)
+
+
+def match_choice(field: AppField, answer: str) -> str | None:
+    """The field's choice matching answer, or answer itself for free text."""
+    if not field.multiple_choice:
+        return answer
+    for choice in field.choices or []:
+        if normalize_question(choice) == normalize_question(answer):
+            return choice
+    return None
+
+
+def get_cached_answers(
+    fields: list[AppField], job: Job, user_hash: str
+) -> list[str | None]:
+    """Cached answers aligned with fields; None for misses and company-specific questions."""
+    answers = [None] * len(fields)
+    if not ANSWER_CACHE_TTL_SECONDS:
+        return answers
+
+    lookups = {
+        i: answer_cache_key(field, user_hash)
+        for i, field in enumerate(fields)
+        if is_company_independent(field, job)
+    }
+    if not lookups:
+        return answers
+
+    try:
+        values = redis_client.mget(list(lookups.values()))
+        hit_keys = []
+        for (i, key), value in zip(lookups.items(), values):
+            if value is not None:
+                answers[i] = match_choice(fields[i], value.decode())
+                if answers[i] is not None:
+                    hit_keys.append(key)
+        if hit_keys:
+            now = time.time()
+            pipe = redis_client.pipeline()
+            for key in hit_keys:
+                pipe.expire(key, ANSWER_CACHE_TTL_SECONDS)
+            pipe.zadd(ANSWER_CACHE_INDEX, {key: now for key in hit_keys})
+            pipe.execute()
+    except redis.RedisError:
+        logging.warning("Answer cache unavailable; answering all questions")
+        return [None] * len(fields)
+
+    hits = sum(answer is not None for answer in answers)
+    record_cache_lookups("answers", hits, len(lookups) - hits)
+    return answers
+
+
+def store_answers(fields: list[AppField], job: Job, user_hash: str):
+    """Cache the answers of company-independent fields and evict old entries."""
+    if not ANSWER_CACHE_TTL_SECONDS:
+        return
+
+    entries = {
+        answer_cache_key(field, user_hash): field.answer
+        for field in fields
+        if field.answer and is_company_independent(field, job)
+    }
+    if not entries:
+        return
+
+    now = time.time()
+    try:
+        pipe = redis_client.pipeline()
+        for key, answer in entries.items():
+            pipe.set(key, answer, ex=ANSWER_CACHE_TTL_SECONDS)
+        pipe.zadd(ANSWER_CACHE_INDEX, {key: now for key in entries})
+        pipe.execute()
+        evict_answers()
+    except redis.RedisError:
+        logging.warning("Answer cache unavailable; answers not cached")
+
+
+def evict_answers() -> int:
+    """Drop expired entries from the index and the least recently used past the cap."""
+    evicted = redis_client.zremrangebyscore(
+        ANSWER_CACHE_INDEX, "-inf", time.time() - ANSWER_CACHE_TTL_SECONDS
+    )
+
+    overflow = redis_client.zcard(ANSWER_CACHE_INDEX) - ANSWER_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        keys = redis_client.zrange(ANSWER_CACHE_INDEX, 0, overflow - 1)
+        pipe = redis_client.pipeline()
+        pipe.delete(*keys)
+        pipe.zrem(ANSWER_CACHE_INDEX, *keys)
+        pipe.execute()
+        evicted += len(keys)
+
+    if evicted:
+        logging.info(f"Evicted {evicted} cached answers")
+    return evicted
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+from core.answers import normalize_question
+from core.llm import client
+from core.utils import with_retry
+from schemas.definitions import AppField
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "256"))
+
+
+def embed_questions(questions: list[str]) -> np.ndarray:
+    """Unit-normalized embeddings of the questions, one row per question."""
+    if not questions:
+        return np.zeros((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+
+    response = with_retry(
+        client.embeddings.create,
+        model=EMBEDDING_MODEL,
+        input=[normalize_question(question) for question in questions],
+        dimensions=EMBEDDING_DIMENSIONS,
+    )
+    vectors = np.array(
+        [item.embedding for item in sorted(response.data, key=lambda d: d.index)],
+        dtype=np.float32,
+    )
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class AnswerIndex:
+    """Approved answers searchable by cosine similarity of their questions."""
+
+    def __init__(self, examples: list[AppField], embeddings: list[list[float]]):
+        # vectors from a different model configuration can't be compared
+        pairs = [
+            (example, embedding)
+            for example, embedding in zip(examples, embeddings)
+            if len(embedding) == EMBEDDING_DIMENSIONS
+        ]
+        self.examples = [example for example, _ in pairs]
+        self.vectors = np.array(
+            [embedding for _, embedding in pairs], dtype=np.float32
+        ).reshape(len(pairs), EMBEDDING_DIMENSIONS)
+
+    def __len__(self):
+        return len(self.examples)
+
+    def search(self, queries: np.ndarray, k: int) -> list[list[tuple[float, AppField]]]:
+        """Top k examples per query row, most similar first."""
+        if not len(self) or not len(queries):
+            return [[] for _ in range(len(queries))]
+
+        k = min(k, len(self))
+        # rows are unit-normalized, so the dot product is the cosine similarity
+        scores = queries @ self.vectors.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [(float(score), self.examples[i]) for i, score in zip(row_ids, row_scores)]
+            for row_ids, row_scores in zip(top, top_scores)
+        ]
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import logging
+import os
+from urllib.parse import urlparse
+
+import redis
+from core.utils import run_async
+from db.cache import redis_client
+from scrapers.sites.linkedin import (
+    fetch_expiration,
+    fetch_expiration_async,
+    get_async_http_client,
+)
+
+EXPIRATION_VALIDATORS_KEY = "expiration:validators:{url}"
+# Validators older than this are dropped and the page is fetched in full
+EXPIRATION_VALIDATORS_TTL_SECONDS = int(
+    os.getenv("EXPIRATION_VALIDATORS_TTL_SECONDS", str(60 * 60 * 24 * 30))
+)
+
+# Sweeps keep this many requests in flight, at most EXPIRATION_HOST_RATE per
+# second to any one host; 0 disables the rate limit
+EXPIRATION_SWEEP_CONCURRENCY = int(os.getenv("EXPIRATION_SWEEP_CONCURRENCY", "32"))
+EXPIRATION_HOST_RATE = float(os.getenv("EXPIRATION_HOST_RATE", "5"))
+
+
+def _load_validators_many(urls: list[str]) -> list[tuple[str | None, str | None]]:
+    """(etag, last_modified) per url, (None, None) where none are stored."""
+    if not urls:
+        return []
+    try:
+        values = redis_client.mget(
+            [EXPIRATION_VALIDATORS_KEY.format(url=url) for url in urls]
+        )
+    except redis.RedisError:
+        logging.warning(f"Validator store unavailable; could not read {len(urls)} urls")
+        return [(None, None)] * len(urls)
+
+    validators = []
+    for value in values:
+        stored = json.loads(value) if value else {}
+        validators.append((stored.get("etag"), stored.get("last_modified")))
+    return validators
+
+
+def _store_validators_many(updates: dict[str, tuple[str | None, str | None]]):
+    """Write url -> (etag, last_modified); urls without validators are cleared."""
+    if not updates:
+        return
+    try:
+        pipe = redis_client.pipeline()
+        for url, (etag, last_modified) in updates.items():
+            key = EXPIRATION_VALIDATORS_KEY.format(url=url)
+            if etag or last_modified:
+                value = json.dumps({"etag": etag, "last_modified": last_modified})
+                pipe.set(key, value, ex=EXPIRATION_VALIDATORS_TTL_SECONDS)
+            else:
+                pipe.delete(key)
+        pipe.execute()
+    except redis.RedisError:
+        logging.warning(
+            f"Validator store unavailable; could not write {len(updates)} urls"
+        )
+
+
+def _load_validators(url: str) -> tuple[str | None, str | None]:
+    return _load_validators_many([url])[0]
+
+
+def _store_validators(url: str, etag: str | None, last_modified: str | None):
+    _store_validators_many({url: (etag, last_modified)})
+
+
+def check_linkedin_expiration(url: str) -> bool:
+    """Whether a LinkedIn posting is closed.
+
+    Open postings' ETag/Last-Modified are kept in Redis, so rechecking an
+    unchanged page costs a 304 instead of the full download.
+    """
+    etag, last_modified = _load_validators(url)
+    expired, etag, last_modified = fetch_expiration(url, etag, last_modified)
+    if expired is None:
+        # unchanged since the last check, when it was still open
+        return False
+
+    if expired:
+        _store_validators(url, None, None)
+    else:
+        _store_validators(url, etag, last_modified)
+    return expired
+
+
+class HostRateLimiter:
+    """Spaces out requests so no host sees more than rate per second.
+
+    Slots are reserved without awaiting, so tasks on one event loop need no lock.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        # host -> loop time of its next free slot
+        self._next_slot: dict[str, float] = {}
+
+    async def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlparse(url).hostname or ""
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def _fetch_expirations(
+    urls: list[str], validators: list[tuple[str | None, str | None]]
+) -> list:
+    semaphore = asyncio.Semaphore(EXPIRATION_SWEEP_CONCURRENCY)
+    limiter = HostRateLimiter(EXPIRATION_HOST_RATE)
+
+    async with get_async_http_client() as client:
+
+        async def fetch(url, etag, last_modified):
+            async with semaphore:
+                await limiter.wait(url)
+                return await fetch_expiration_async(client, url, etag, last_modified)
+
+        return await asyncio.gather(
+            *(fetch(url, *pair) for url, pair in zip(urls, validators)),
+            return_exceptions=True,
+        )
+
+
+def check_linkedin_expirations(urls: list[str]) -> list[bool | None | Exception]:
+    """Check many postings at once; results are aligned with urls.
+
+    Each result is True if the posting is closed, False if it is open but
+    changed since the validators were issued, and None if it is open with no
+    sign of change (304, or nothing to revalidate against). A failed check
+    yields its exception instead of raising.
+
+    Pages are fetched concurrently under a per-host rate limit, and validators
+    are read and written in one round trip each.
+    """
+    validators = _load_validators_many(urls)
+    results = run_async(_fetch_expirations(urls, validators))
+
+    expirations = []
+    updates = {}
+    for url, (stored_etag, stored_last_modified), result in zip(
+        urls, validators, results
+    ):
+        if isinstance(result, Exception):
+            expirations.append(result)
+            continue
+        expired, etag, last_modified = result
+        if expired is None:
+            expirations.append(None)
+            continue
+        updates[url] = (None, None) if expired else (etag, last_modified)
+        if expired:
+            expirations.append(True)
+        else:
+            # a full response to a conditional request means the page changed
+            revalidated = stored_etag is not None or stored_last_modified is not None
+            expirations.append(False if revalidated else None)
+
+    _store_validators_many(updates)
+    return expirations
@@ -0,0 +1,83 @@
+import hashlib
+import logging
+import os
+import time
+
+import redis
+from core.utils import with_retry
+from db.cache import redis_client
+from openai import APIConnectionError, InternalServerError, NotFoundError, OpenAI
+
+RESUME_FILE_KEY = "openai:resume_file:{digest}"
+
+# How long a file id is trusted before checking that the remote file still exists
+VALIDATE_INTERVAL_SECONDS = int(os.getenv("RESUME_FILE_VALIDATE_INTERVAL", "3600"))
+
+# digest -> (file_id, last validated at), per process
+_validated: dict[str, tuple[str, float]] = {}
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remote_file_exists(client: OpenAI, file_id: str) -> bool:
+    try:
+        remote = with_retry(
+            client.files.retrieve,
+            file_id,
+            retry_exceptions=(APIConnectionError, InternalServerError),
+        )
+    except NotFoundError:
+        return False
+    expires_at = getattr(remote, "expires_at", None)
+    return expires_at is None or expires_at > time.time() + VALIDATE_INTERVAL_SECONDS
+
+
+def _load_file_id(key: str) -> str | None:
+    try:
+        value = redis_client.get(key)
+    except redis.RedisError:
+        logging.warning(f"Resume file registry unavailable; could not read {key}")
+        return None
+    return value.decode() if value else None
+
+
+def _store_file_id(key: str, file_id: str):
+    try:
+        redis_client.set(key, file_id)
+    except redis.RedisError:
+        logging.warning(f"Resume file registry unavailable; could not write {key}")
+
+
+def get_resume_file_id(client: OpenAI, resume_pdf_path: str) -> str:
+    """Return an OpenAI file id for the resume, uploading only when needed.
+
+    File ids are keyed by the PDF's content hash and shared across workers via
+    Redis, so the resume is re-uploaded only when it changes or the remote file
+    is gone.
+    """
+    digest = file_digest(resume_pdf_path)
+    key = RESUME_FILE_KEY.format(digest=digest)
+
+    cached = _validated.get(digest)
+    if cached and time.time() - cached[1] < VALIDATE_INTERVAL_SECONDS:
+        return cached[0]
+
+    file_id = cached[0] if cached else _load_file_id(key)
+    if file_id and _remote_file_exists(client, file_id):
+        _validated[digest] = (file_id, time.time())
+        return file_id
+
+    with open(resume_pdf_path, "rb") as f:
+        file_id = with_retry(client.files.create, file=f, purpose="user_data").id
+    logging.info(f"Uploaded resume {digest[:12]} as {file_id}")
+
+    _store_file_id(key, file_id)
+    _validated[digest] = (file_id, time.time())
+    return file_id
@@ -1,26 +1,69 @@
+import asyncio
 import logging
-import re
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
-from core.llm import answer_question, upload_resume
-from core.utils import clean_url, clean_val, get_base_url
+from core.answers import (
+    get_cached_answers,
+    is_company_independent,
+    match_choice,
+    profile_hash,
+    store_answers,
+)
+from core.embeddings import AnswerIndex, embed_questions
+from core.expiration import check_linkedin_expiration, check_linkedin_expirations
+from core.llm import answer_question, answer_questions, upload_resume
+from core.matching import get_common_question_matcher
+from core.utils import (
+    clean_column,
+    clean_url,
+    clean_url_column,
+    clean_val,
+    get_base_url,
+    run_async,
+)
 from jobspy import scrape_jobs
 from schemas.definitions import App, Job, User
 from schemas.errors import MissingAppUrlError
+from scrapers.browser import AsyncBrowserPool
 from scrapers.scraper import JobSite
-from scrapers.sites import Ashby, LinkedIn
+from scrapers.sites import Ashby, AsyncAshby, LinkedIn
 
 DOMAIN_HANDLERS = {"jobs.ashbyhq.com": Ashby, "www.linkedin.com": LinkedIn}
+# Sites whose forms can be scraped concurrently in one event loop
+ASYNC_DOMAIN_HANDLERS = {"jobs.ashbyhq.com": AsyncAshby}
 
+# Max forms loading at once per domain when scraping in batches
+SCRAPE_CONCURRENCY_PER_DOMAIN = int(os.getenv("SCRAPE_CONCURRENCY_PER_DOMAIN", "4"))
 
-def _create_common_questions_regular_expression(common_questions: dict[str]):
-    pattern = r"("
-    for i, key in enumerate(common_questions.keys()):
-        if i + 1 < len(common_questions.keys()):
-            pattern += f"{key}|"
-        else:
-            pattern += f"{key})"
-    return pattern
+# Max questions answered in parallel per application (1 answers them serially)
+PREPARE_CONCURRENCY = int(os.getenv("PREPARE_CONCURRENCY", "8"))
+
+# "concurrent" answers each question with its own call; "batch" answers all in one call
+PREPARE_MODE = os.getenv("PREPARE_MODE", "concurrent")
+
+# Approved answers at least this similar to a new question are reused as-is;
+# otherwise the top ANSWER_EXAMPLES_K are shown to the model as examples
+ANSWER_REUSE_THRESHOLD = float(os.getenv("ANSWER_REUSE_THRESHOLD", "0.93"))
+ANSWER_EXAMPLES_K = int(os.getenv("ANSWER_EXAMPLES_K", "3"))
+
+# jobspy column -> Job attribute
+JOBSPY_COLUMNS = {
+    "id": "jobspy_id",
+    "title": "title",
+    "company": "company",
+    "location": "location",
+    "min_amount": "min_salary",
+    "max_amount": "max_salary",
+    "date_posted": "date_posted",
+    "job_type": "job_type",
+    "job_url": "linkedin_job_url",
+    "job_url_direct": "direct_job_url",
+    "description": "description",
+}
+JOBSPY_URL_COLUMNS = ("job_url", "job_url_direct")
 
 
 def _preprocess_jobspy_listing(listing: dict) -> dict:
@@ -49,6 +92,26 @@ def _preprocess_jobspy_listing(listing: dict) -> dict:
     return mapped_data
 
 
+def _preprocess_jobspy_listings(listings: pd.DataFrame) -> list[dict]:
+    """_preprocess_jobspy_listing for a whole DataFrame, one column at a time."""
+    columns = {}
+    for column, attribute in JOBSPY_COLUMNS.items():
+        values = (
+            listings[column]
+            if column in listings
+            else pd.Series(None, index=listings.index, dtype=object)
+        )
+        if column == "date_posted":
+            # str() per value, matching the row path (e.g. Timestamps keep their time)
+            values = values.astype(object).map(str)
+        values = clean_column(values)
+        if column in JOBSPY_URL_COLUMNS:
+            values = clean_url_column(values)
+        columns[attribute] = values
+
+    return pd.DataFrame(columns, index=listings.index).to_dict("records")
+
+
 def get_domain_handler(url: str) -> JobSite:
     base_url = get_base_url(url)
     if base_url in DOMAIN_HANDLERS:
@@ -57,26 +120,28 @@ def get_domain_handler(url: str) -> JobSite:
         return None
 
 
-def save_jobs(num_jobs=5) -> list[Job]:
-    """Finds jobs and saves them to the database."""
+def save_jobs(
+    num_jobs=5,
+    *,
+    site="linkedin",
+    search_term="software engineer",
+    location="New York, NY",
+    hours_old=24,
+) -> list[Job]:
+    """Finds jobs for one search on one site."""
     listings: pd.DataFrame = scrape_jobs(
-        site_name=[
-            "linkedin",
-        ],
-        search_term="software engineer",
-        location="New York, NY",
+        site_name=[site],
+        search_term=search_term,
+        location=location,
         results_wanted=num_jobs,
-        hours_old=24,
+        hours_old=hours_old,
         country_indeed="USA",
         linkedin_fetch_description=True,
         # proxies=["208.195.175.46:65095", "208.195.175.45:65095", "localhost"],
     )
 
     # Convert listings to Job objects
-    jobs = [
-        Job(**_preprocess_jobspy_listing(row.to_dict()))
-        for _, row in listings.iterrows()
-    ]
+    jobs = [Job(**listing) for listing in _preprocess_jobspy_listings(listings)]
 
     return jobs
 
@@ -95,23 +160,134 @@ def scrape_job_app(job: Job) -> App:
     return job_site.scrape_questions()
 
 
-def prepare_job_app(job: Job, app: App, user: User) -> App:
-    """Initially fill out application questions."""
-    common_questions = user.get_common_questions()
-    pattern = _create_common_questions_regular_expression(common_questions)
+async def _scrape_job_apps(jobs: list[Job], per_domain: int) -> list:
+    limits = defaultdict(lambda: asyncio.Semaphore(per_domain))
+
+    async with AsyncBrowserPool("firefox") as pool:
+
+        async def scrape(job: Job) -> App:
+            job_url = job.direct_job_url or job.linkedin_job_url
+            if not job_url:
+                raise ValueError("Job must have a direct job URL or LinkedIn job URL.")
+            domain = get_base_url(job_url)
+            if domain not in ASYNC_DOMAIN_HANDLERS:
+                raise NotImplementedError(f"Site not supported: {job_url}")
+
+            async with limits[domain]:
+                return await ASYNC_DOMAIN_HANDLERS[domain](job, pool).scrape_questions()
+
+        return await asyncio.gather(
+            *(scrape(job) for job in jobs), return_exceptions=True
+        )
+
+
+def scrape_job_apps(
+    jobs: list[Job], *, per_domain: int = SCRAPE_CONCURRENCY_PER_DOMAIN
+) -> list[App | Exception]:
+    """Scrape many application forms concurrently in one event loop.
+
+    Results line up with jobs; a job that failed gets its exception instead
+    of an App.
+    """
+    return run_async(_scrape_job_apps(jobs, per_domain))
 
-    # Upload resume once for this request and reuse the file id
+
+def prepare_job_app(
+    job: Job,
+    app: App,
+    user: User,
+    *,
+    concurrency: int = PREPARE_CONCURRENCY,
+    mode: str = PREPARE_MODE,
+    answer_index: AnswerIndex | None = None,
+) -> App:
+    """Initially fill out application questions.
+
+    Common questions are answered from the user's profile, and previously seen
+    company-independent questions from the answer cache or, when a nearly
+    identical question was answered in an approved application, from
+    answer_index. Other close matches are passed to the LLM as examples.
+    In batch mode the rest are answered with a single LLM call, and anything it
+    leaves invalid falls through to per-question calls, up to `concurrency` at
+    a time.
+    """
+    matcher = get_common_question_matcher(user)
+
+    # Reuse the registered resume upload across tasks
     resume_file_id = upload_resume(user.resume_pdf_path)
 
+    unanswered = []
     for field in app.fields:
-        matches = re.findall(pattern, field.question, re.IGNORECASE)
-        if matches:
-            field.answer = common_questions[matches[0].lower()]
+        keyword = matcher.match(field.question)
+        if keyword is not None:
+            field.answer = matcher.answers[keyword]
         else:
-            response = answer_question(
-                field, job, app, user, resume_file_id=resume_file_id
+            unanswered.append(field)
+
+    # Company-independent questions answered for an earlier app skip the LLM
+    user_hash = profile_hash(user)
+    cached = get_cached_answers(unanswered, job, user_hash)
+    for field, cached_answer in zip(unanswered, cached):
+        field.answer = cached_answer
+    unanswered = [field for field in unanswered if field.answer is None]
+
+    # id(field) -> approved answers to similar questions, shown as examples
+    examples = {}
+    if unanswered and answer_index is not None and len(answer_index):
+        neighbors = answer_index.search(
+            embed_questions([field.question for field in unanswered]),
+            ANSWER_EXAMPLES_K,
+        )
+        for field, matches in zip(unanswered, neighbors):
+            score, example = matches[0]
+            if score >= ANSWER_REUSE_THRESHOLD and is_company_independent(field, job):
+                field.answer = match_choice(field, example.answer)
+            if field.answer is None:
+                examples[id(field)] = [example for _, example in matches]
+        unanswered = [field for field in unanswered if field.answer is None]
+
+    generated = list(unanswered)
+
+    if unanswered and mode == "batch":
+        try:
+            answers = answer_questions(
+                unanswered,
+                job,
+                app,
+                user,
+                resume_file_id=resume_file_id,
+                examples=[examples.get(id(field)) for field in unanswered],
             )
-            field.answer = response.output_text.strip()
+        except Exception as e:
+            # refusals, empty or malformed output, API errors: answer individually
+            logging.warning(f"Batch answering failed for app {app.id}: {e}")
+            answers = [None] * len(unanswered)
+        for field, batch_answer in zip(unanswered, answers):
+            field.answer = batch_answer
+        unanswered = [field for field in unanswered if field.answer is None]
+        if unanswered:
+            logging.warning(
+                f"Batch answers invalid for {len(unanswered)} questions in app {app.id}; answering individually"
+            )
+
+    def answer(field):
+        return answer_question(
+            field,
+            job,
+            app,
+            user,
+            resume_file_id=resume_file_id,
+            examples=examples.get(id(field)),
+        )
+
+    if unanswered:
+        workers = max(1, min(concurrency, len(unanswered)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # map yields in submission order, so answers line up with their fields
+            for field, response in zip(unanswered, pool.map(answer, unanswered)):
+                field.answer = response.output_text.strip()
+
+    store_answers(generated, job, user_hash)
 
     return app
 
@@ -132,7 +308,12 @@ def submit_app(app: App, job: Job) -> App:
 
 
 def check_job_expiration(job) -> bool:
-    return LinkedIn(job).check_for_expiration()
+    return check_linkedin_expiration(job.linkedin_job_url)
+
+
+def check_job_expirations(jobs: list[Job]) -> list[bool | None | Exception]:
+    """Expiration of each job, checked concurrently; see check_linkedin_expirations."""
+    return check_linkedin_expirations([job.linkedin_job_url for job in jobs])
 
 
 if __name__ == "__main__":
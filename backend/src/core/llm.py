@@ -1,137 +1,361 @@
 import json
 import logging
 
+from core.files import get_resume_file_id
+from core.metrics import record_llm_usage
+from core.prompts import get_prompt
 from core.utils import with_retry
-from openai import OpenAI
+from openai import APIConnectionError, InternalServerError, OpenAI
 from openai.types.responses import Response
 from schemas.definitions import App, AppField, Job, Review, User
 
 client = OpenAI(timeout=60)
 
+# Appended to the filler instructions when all of an app's questions are answered at once
+BATCH_FORMAT = """You will receive a JSON array of application questions. Each has an "index", a "question" and, for multiple choice questions, its "choices" (null otherwise).
+Answer every question following the instructions above. For multiple choice questions the answer must be exactly one of the given choices.
+Some questions include "examples": answers the jobseeker approved for similar questions. Keep your answers consistent with them.
+Respond with JSON of the form {"answers": [{"index": <index>, "answer": <answer>}]}."""
+
+BATCH_ANSWERS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "answers": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "answer": {"type": "string"},
+                },
+                "required": ["index", "answer"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["answers"],
+    "additionalProperties": False,
+}
+
 
 def upload_resume(resume_pdf_path: str):
-    # Upload resume once for this request and reuse the file id
-    with open(resume_pdf_path, "rb") as f:
-        resume_pdf = with_retry(client.files.create, file=f, purpose="user_data")
-        return resume_pdf.id
+    # Reuses the previously uploaded file until the PDF changes
+    return get_resume_file_id(client, resume_pdf_path)
 
 
-def evaluate_candidate_aptitude(job: Job, user: User) -> Review:
-    """Review job and resume and determine fit for the role."""
-    with open(".instructions/REVIEWER.md", "r") as f:
-        instructions = f.read()
-
-    # upload resume (retry on transient 5xx)
-    with open(user.resume_pdf_path, "rb") as f:
-        resume_pdf = with_retry(
-            client.files.create,
-            file=f,
-            purpose="user_data",
-        )
+def _context_input(
+    instructions: str, resume_file_id: str, user: User | None = None
+) -> list[dict]:
+    """Messages that stay the same across calls with the same instructions.
+
+    Prompt caching only matches an identical prefix, so instructions, profile and
+    resume always come first, in this order, and per-job content goes after.
+    """
+    messages = [{"role": "developer", "content": instructions}]
+    if user is not None:
+        messages.append({"role": "user", "content": user.to_prompt()})
+    messages += [
+        {"role": "assistant", "content": "Please provide the jobseeker's resume"},
+        {
+            "role": "user",
+            "content": [{"type": "input_file", "file_id": resume_file_id}],
+        },
+    ]
+    return messages
+
+
+def _job_input(job: Job) -> list[dict]:
+    return [
+        {
+            "role": "assistant",
+            "content": "Please provide the company name, the role name, and role description of the job the jobseeker is applying for.",
+        },
+        {"role": "user", "content": job.to_prompt()},
+    ]
+
+
+def _examples_input(examples: list[AppField] | None) -> list[dict]:
+    if not examples:
+        return []
+    approved = "\n\n".join(f"Q: {e.question}\nA: {e.answer}" for e in examples)
+    return [
+        {
+            "role": "assistant",
+            "content": "Please provide answers the jobseeker has approved for similar questions.",
+        },
+        {"role": "user", "content": approved},
+    ]
 
+
+def _create_response(call_site: str, cache_key: str, **kwargs) -> Response:
+    """Create a response and record how much of its input hit the prompt cache."""
     response = with_retry(
         client.responses.create,
         model="gpt-5-nano",
-        input=[
-            {"role": "developer", "content": instructions},
-            {"role": "user", "content": job.description},
-            {"role": "assistant", "content": "Please provide the resume PDF."},
-            {
-                "role": "user",
-                "content": [{"type": "input_file", "file_id": resume_pdf.id}],
-            },
-        ],
+        prompt_cache_key=cache_key,
+        **kwargs,
     )
+    record_llm_usage(call_site, response.usage)
+    return response
 
+
+def _review_input(job: Job, instructions: str, resume_file_id: str) -> list[dict]:
+    return [
+        *_context_input(instructions, resume_file_id),
+        {"role": "assistant", "content": "Please provide the job description."},
+        {"role": "user", "content": job.description},
+    ]
+
+
+def _parse_review(output_text: str, method: str) -> Review:
     try:
-        review_data = json.loads(response.output_text)
+        review_data = json.loads(output_text)
         return Review(**review_data)
     except json.JSONDecodeError as e:
         logging.error(
             {
-                "method": "llm.apply.evaluate_candidate_aptitude",
+                "method": method,
                 "type": "FailedToParseOutput",
-                "response": response.output_text,
+                "response": output_text,
             }
         )
         raise e
 
 
+def evaluate_candidate_aptitude(job: Job, user: User) -> Review:
+    """Review job and resume and determine fit for the role."""
+    instructions = get_prompt("REVIEWER")
+
+    resume_file_id = upload_resume(user.resume_pdf_path)
+
+    response = _create_response(
+        "review",
+        f"review:{resume_file_id}",
+        input=_review_input(job, instructions, resume_file_id),
+    )
+
+    return _parse_review(response.output_text, "llm.apply.evaluate_candidate_aptitude")
+
+
+def submit_review_batch(jobs: list[Job], user: User) -> str:
+    """Submit reviews for many jobs as one Batch API job and return the batch id.
+
+    Each request's custom_id is the job id, so results can be matched back
+    with get_review_batch_results.
+    """
+    instructions = get_prompt("REVIEWER")
+
+    resume_file_id = upload_resume(user.resume_pdf_path)
+
+    lines = [
+        json.dumps(
+            {
+                "custom_id": str(job.id),
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": {
+                    "model": "gpt-5-nano",
+                    "prompt_cache_key": f"review:{resume_file_id}",
+                    "input": _review_input(job, instructions, resume_file_id),
+                },
+            }
+        )
+        for job in jobs
+    ]
+    batch_file = with_retry(
+        client.files.create,
+        file=("reviews.jsonl", "\n".join(lines).encode()),
+        purpose="batch",
+    )
+    batch = with_retry(
+        client.batches.create,
+        input_file_id=batch_file.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+    )
+    logging.info(f"Submitted review batch {batch.id} with {len(jobs)} jobs")
+    return batch.id
+
+
+def _output_text(body: dict) -> str:
+    """Concatenate the output_text parts of a raw Responses API body."""
+    return "".join(
+        content.get("text", "")
+        for item in body.get("output") or []
+        if item.get("type") == "message"
+        for content in item.get("content") or []
+        if content.get("type") == "output_text"
+    )
+
+
+def get_review_batch_results(batch_id: str) -> tuple[str, dict[str, Review] | None]:
+    """Fetch a review batch's status and, once it has finished, its reviews.
+
+    Returns (status, reviews) where reviews maps job id to Review and is None
+    while the batch is still running. Jobs whose request failed or whose output
+    could not be parsed are left out. An unknown batch raises NotFoundError
+    without retrying.
+    """
+    batch = with_retry(
+        client.batches.retrieve,
+        batch_id,
+        retry_exceptions=(APIConnectionError, InternalServerError),
+    )
+    if batch.status not in ("completed", "failed", "expired", "cancelled"):
+        return batch.status, None
+
+    reviews = {}
+    if batch.output_file_id:
+        output = with_retry(client.files.content, batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            record_llm_usage("review_batch", (response.get("body") or {}).get("usage"))
+            try:
+                reviews[result["custom_id"]] = _parse_review(
+                    _output_text(response.get("body") or {}),
+                    "llm.apply.get_review_batch_results",
+                )
+            except Exception:
+                continue
+
+    return batch.status, reviews
+
+
 def answer_question(
-    field: AppField, job: Job, app: App, user: User, *, resume_file_id: str | None
+    field: AppField,
+    job: Job,
+    app: App,
+    user: User,
+    *,
+    resume_file_id: str | None,
+    examples: list[AppField] | None = None,
 ) -> Response:
-    # I want the AI to have a large source of data about the applicant. It should have more than just the resume,
-    # but also use answers the applicant has already provided if possible.
+    # The model sees the profile and resume, plus approved answers to similar
+    # questions from earlier applications when there are any.
 
-    # Ensure we have a resume file id (upload once per prepare request)
+    # Ensure we have a resume file id (reused across tasks via the registry)
     if not resume_file_id:
-        with open(user.resume_pdf_path, "rb") as f:
-            resume_pdf = with_retry(
-                client.files.create,
-                file=f,
-                purpose="user_data",
-            )
-            resume_file_id = resume_pdf.id
+        resume_file_id = upload_resume(user.resume_pdf_path)
 
     if field.multiple_choice:
-        with open(".instructions/MC_FILLER.md", "r") as f:
-            instructions = f.read()
-
-        response = with_retry(
-            client.responses.create,
-            model="gpt-5-nano",
-            input=[
-                {"role": "developer", "content": instructions},
-                {"role": "user", "content": user.to_prompt()},
-                {
-                    "role": "assistant",
-                    "content": "Please provide the jobseeker's resume",
-                },
-                {
-                    "role": "user",
-                    "content": [{"type": "input_file", "file_id": resume_file_id}],
-                },
-                {
-                    "role": "assistant",
-                    "content": "Please provide the company name, the role name, and role description of the job the jobseeker is applying for.",
-                },
-                {"role": "user", "content": job.to_prompt()},
-                {
-                    "role": "assistant",
-                    "content": "Please provide the application question and choices in a numbered list.",
-                },
-                {"role": "user", "content": field.to_prompt()},
-            ],
+        template = "MC_FILLER"
+        request = (
+            "Please provide the application question and choices in a numbered list."
         )
+        question = field.to_prompt()
     else:
-        with open(".instructions/TEXT_FILLER.md", "r") as f:
-            instructions = f.read()
-
-        response = with_retry(
-            client.responses.create,
-            model="gpt-5-nano",
-            input=[
-                {"role": "developer", "content": instructions},
-                {"role": "user", "content": user.to_prompt()},
-                {
-                    "role": "assistant",
-                    "content": "Please provide the jobseeker's resume",
-                },
-                {
-                    "role": "user",
-                    "content": [{"type": "input_file", "file_id": resume_file_id}],
-                },
-                {
-                    "role": "assistant",
-                    "content": "Please provide the company name, the role name, and role description of the job the jobseeker is applying for.",
-                },
-                {"role": "user", "content": job.to_prompt()},
-                {
-                    "role": "assistant",
-                    "content": "Please provide the application question.",
-                },
-                {"role": "user", "content": field.question},
-            ],
-        )
+        template = "TEXT_FILLER"
+        request = "Please provide the application question."
+        question = field.question
+
+    instructions = get_prompt(template)
+
+    response = _create_response(
+        "answer_question",
+        f"{template}:{resume_file_id}",
+        input=[
+            *_context_input(instructions, resume_file_id, user),
+            *_job_input(job),
+            *_examples_input(examples),
+            {"role": "assistant", "content": request},
+            {"role": "user", "content": question},
+        ],
+    )
 
     return response
+
+
+def _validate_answer(field: AppField, answer) -> str | None:
+    """Normalize an answer, or None if it is empty or not one of the field's choices."""
+    if not isinstance(answer, str) or not answer.strip():
+        return None
+    answer = answer.strip()
+    if not field.multiple_choice:
+        return answer
+
+    for choice in field.choices or []:
+        if choice.strip().lower() == answer.lower():
+            return choice
+    return None
+
+
+def answer_questions(
+    fields: list[AppField],
+    job: Job,
+    app: App,
+    user: User,
+    *,
+    resume_file_id: str | None,
+    examples: list[list[AppField]] | None = None,
+) -> list[str | None]:
+    """Answer all of an application's questions in a single call.
+
+    The shared context (instructions, profile, resume, job) is sent once.
+    Returns answers aligned with fields; an entry is None when the model
+    skipped the question or picked a choice that is not offered.
+    """
+    if not resume_file_id:
+        resume_file_id = upload_resume(user.resume_pdf_path)
+
+    instructions = "\n\n".join(
+        [get_prompt("TEXT_FILLER"), get_prompt("MC_FILLER"), BATCH_FORMAT]
+    )
+
+    questions = []
+    for i, field in enumerate(fields):
+        question = {
+            "index": i,
+            "question": field.question,
+            "choices": field.choices if field.multiple_choice else None,
+        }
+        if examples and examples[i]:
+            question["examples"] = [
+                {"question": e.question, "answer": e.answer} for e in examples[i]
+            ]
+        questions.append(question)
+
+    response = _create_response(
+        "answer_questions",
+        f"BATCH_FILLER:{resume_file_id}",
+        input=[
+            *_context_input(instructions, resume_file_id, user),
+            *_job_input(job),
+            {
+                "role": "assistant",
+                "content": "Please provide the application questions.",
+            },
+            {"role": "user", "content": json.dumps(questions)},
+        ],
+        text={
+            "format": {
+                "type": "json_schema",
+                "name": "application_answers",
+                "schema": BATCH_ANSWERS_SCHEMA,
+                "strict": True,
+            }
+        },
+    )
+
+    try:
+        data = json.loads(response.output_text)
+    except json.JSONDecodeError as e:
+        logging.error(
+            {
+                "method": "llm.apply.answer_questions",
+                "type": "FailedToParseOutput",
+                "response": response.output_text,
+            }
+        )
+        raise e
+
+    answers = [None] * len(fields)
+    for item in data.get("answers", []):
+        index = item.get("index")
+        if isinstance(index, int) and 0 <= index < len(fields):
+            answers[index] = _validate_answer(fields[index], item.get("answer"))
+    return answers
@@ -0,0 +1,34 @@
+import re
+from functools import lru_cache
+
+from schemas.definitions import User
+
+
+class CommonQuestionMatcher:
+    """Finds profile-answerable keywords (e.g. "email") in application questions.
+
+    All keywords are escaped into one case-insensitive alternation compiled
+    once. Longer keywords come first, so "first name" wins over "name".
+    """
+
+    def __init__(self, answers: dict[str, str | None]):
+        self.answers = {key.lower(): value for key, value in answers.items()}
+        keywords = sorted(self.answers, key=len, reverse=True)
+        self.pattern = re.compile(
+            "|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE
+        )
+
+    def match(self, question: str) -> str | None:
+        """The leftmost keyword found in question, or None."""
+        found = self.pattern.search(question)
+        return found.group(0).lower() if found else None
+
+
+@lru_cache(maxsize=32)
+def _matcher_for(answers: tuple[tuple[str, str | None], ...]) -> CommonQuestionMatcher:
+    return CommonQuestionMatcher(dict(answers))
+
+
+def get_common_question_matcher(user: User) -> CommonQuestionMatcher:
+    """Matcher for the user's common questions, built once per profile."""
+    return _matcher_for(tuple(user.get_common_questions().items()))
@@ -0,0 +1,126 @@
+import logging
+
+import redis
+from db.cache import redis_client
+
+LLM_USAGE_KEY = "metrics:llm_usage:{call_site}"
+CACHE_STATS_KEY = "metrics:cache:{cache}"
+BROWSER_TRAFFIC_KEY = "metrics:browser_traffic:{domain}"
+BROWSER_POOL_KEY = "metrics:browser_pool:{pool}"
+
+
+def record_llm_usage(call_site: str, usage):
+    """Add a response's token usage to the running totals for a call site.
+
+    Accepts either a Responses API usage object or the equivalent dict found in
+    Batch API output. Totals live in Redis so API and worker processes share them.
+    """
+    if usage is None:
+        return
+    if isinstance(usage, dict):
+        input_tokens = usage.get("input_tokens") or 0
+        details = usage.get("input_tokens_details") or {}
+        cached_tokens = details.get("cached_tokens") or 0
+    else:
+        input_tokens = usage.input_tokens or 0
+        details = usage.input_tokens_details
+        cached_tokens = (details.cached_tokens or 0) if details else 0
+
+    logging.debug(f"{call_site}: {cached_tokens}/{input_tokens} input tokens cached")
+    try:
+        pipe = redis_client.pipeline()
+        key = LLM_USAGE_KEY.format(call_site=call_site)
+        pipe.hincrby(key, "calls", 1)
+        pipe.hincrby(key, "input_tokens", input_tokens)
+        pipe.hincrby(key, "cached_tokens", cached_tokens)
+        pipe.execute()
+    except redis.RedisError:
+        logging.warning(f"Metrics store unavailable; dropped usage for {call_site}")
+
+
+def get_llm_usage() -> dict[str, dict]:
+    """Token totals and prompt cache hit rate per call site."""
+    usage = {}
+    for key in redis_client.scan_iter(LLM_USAGE_KEY.format(call_site="*")):
+        call_site = key.decode().rsplit(":", 1)[-1]
+        totals = {k.decode(): int(v) for k, v in redis_client.hgetall(key).items()}
+        input_tokens = totals.get("input_tokens", 0)
+        totals["cache_hit_rate"] = (
+            totals.get("cached_tokens", 0) / input_tokens if input_tokens else 0.0
+        )
+        usage[call_site] = totals
+    return usage
+
+
+def record_cache_lookups(cache: str, hits: int, misses: int):
+    """Add lookup results to a cache's running hit/miss totals."""
+    if not hits and not misses:
+        return
+    try:
+        pipe = redis_client.pipeline()
+        key = CACHE_STATS_KEY.format(cache=cache)
+        pipe.hincrby(key, "hits", hits)
+        pipe.hincrby(key, "misses", misses)
+        pipe.execute()
+    except redis.RedisError:
+        logging.warning(f"Metrics store unavailable; dropped lookups for {cache}")
+
+
+def get_cache_stats(cache: str) -> dict:
+    """Hit/miss totals and hit rate for a cache."""
+    totals = redis_client.hgetall(CACHE_STATS_KEY.format(cache=cache))
+    hits = int(totals.get(b"hits", 0))
+    misses = int(totals.get(b"misses", 0))
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+    }
+
+
+def record_browser_stats(traffic: dict[str, dict], pools: dict[str, dict]):
+    """Add a process's browser traffic and pool counts to the running totals.
+
+    Takes the output of scrapers.browser.take_traffic_stats and
+    take_browser_pool_stats.
+    """
+    if not traffic and not pools:
+        return
+    try:
+        pipe = redis_client.pipeline()
+        for key, group in (
+            (BROWSER_TRAFFIC_KEY.format(domain="{}"), traffic),
+            (BROWSER_POOL_KEY.format(pool="{}"), pools),
+        ):
+            for name, counts in group.items():
+                for field, count in counts.items():
+                    if count:
+                        pipe.hincrby(key.format(name), field, count)
+        pipe.execute()
+    except redis.RedisError:
+        logging.warning("Metrics store unavailable; dropped browser stats")
+
+
+def _scan_totals(pattern: str) -> dict[str, dict]:
+    """Integer hash fields per key matching pattern, keyed by the last key segment."""
+    totals = {}
+    for key in redis_client.scan_iter(pattern):
+        name = key.decode().split(":", 2)[-1]
+        totals[name] = {
+            k.decode(): int(v) for k, v in redis_client.hgetall(key).items()
+        }
+    return totals
+
+
+def get_browser_stats() -> dict[str, dict]:
+    """Request, byte and page load totals per domain, and start counts per pool."""
+    traffic = _scan_totals(BROWSER_TRAFFIC_KEY.format(domain="*"))
+    for totals in traffic.values():
+        page_loads = totals.get("page_loads", 0)
+        totals["avg_load_ms"] = (
+            totals.get("load_ms", 0) / page_loads if page_loads else 0
+        )
+    return {
+        "traffic": traffic,
+        "pools": _scan_totals(BROWSER_POOL_KEY.format(pool="*")),
+    }
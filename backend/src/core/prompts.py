@@ -0,0 +1,44 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+# backend/.instructions, next to src/, regardless of the working directory
+PROMPTS_DIR = Path(
+    os.getenv("PROMPTS_DIR", Path(__file__).resolve().parents[2] / ".instructions")
+)
+
+# name -> (mtime, text, sha256 of text), per process
+_templates: dict[str, tuple[float, str, str]] = {}
+_lock = threading.Lock()
+
+
+def _load(name: str) -> tuple[float, str, str]:
+    path = PROMPTS_DIR / f"{name}.md"
+    mtime = path.stat().st_mtime
+
+    cached = _templates.get(name)
+    if cached and cached[0] == mtime:
+        return cached
+
+    with _lock:
+        cached = _templates.get(name)
+        if cached and cached[0] == mtime:
+            return cached
+        text = path.read_text()
+        template = (mtime, text, hashlib.sha256(text.encode()).hexdigest())
+        _templates[name] = template
+        return template
+
+
+def get_prompt(name: str) -> str:
+    """Text of an .instructions template, e.g. get_prompt("REVIEWER").
+
+    Templates are read once and re-read only when the file's mtime changes.
+    """
+    return _load(name)[1]
+
+
+def get_prompt_hash(name: str) -> str:
+    """SHA-256 of a template's current text; changes whenever the prompt does."""
+    return _load(name)[2]
@@ -1,6 +1,8 @@
+import asyncio
 import logging
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional, Tuple, Type
 from urllib.parse import urlparse
 
@@ -17,6 +19,9 @@ def convert_object_list_to_df(objects: list[object]) -> pd.DataFrame:
     return pd.DataFrame([obj.__dict__ for obj in objects])
 
 
+NA_PLACEHOLDERS = ("", "none", "nan", "nat", "null")
+
+
 def clean_val(x):
     """Normalize values coming from external sources.
 
@@ -28,7 +33,7 @@ def clean_val(x):
         return None
     if isinstance(x, str):
         s = x.strip().lower()
-        if s in {"", "none", "nan", "nat", "null"}:
+        if s in NA_PLACEHOLDERS:
             return None
     return x
 
@@ -38,6 +43,22 @@ def clean_url(url: str) -> Optional[str]:
     return re.sub(r"[?&].*$", "", url) if url else None
 
 
+def clean_column(column: pd.Series) -> pd.Series:
+    """clean_val over a whole column at once; missing values become None."""
+    try:
+        placeholder = column.str.strip().str.lower().isin(NA_PLACEHOLDERS)
+    except AttributeError:  # no string values
+        placeholder = False
+    return column.astype(object).where(~(column.isna() | placeholder), None)
+
+
+def clean_url_column(column: pd.Series) -> pd.Series:
+    """clean_url over a column already passed through clean_column."""
+    if column.isna().all():  # .str needs at least one string
+        return column
+    return column.str.replace(r"[?&].*$", "", regex=True).where(column.notna(), None)
+
+
 def get_base_url(url: str) -> str:
     """Get the base URL from a full URL."""
     if pd.isna(url):
@@ -60,6 +81,17 @@ def get_unique_sites(jobs: list[Job]) -> set[str]:
     return sites
 
 
+def run_async(coro):
+    """Run a coroutine to completion from synchronous code.
+
+    The coroutine gets its own event loop on a fresh thread: a worker that has
+    used sync Playwright keeps that loop registered as running on its thread,
+    where asyncio.run refuses to start.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
 def with_retry(
     func: Callable,
     *args,
@@ -0,0 +1,13 @@
+import os
+
+import redis
+
+REDIS_URL = os.environ.get("CELERY_BACKEND_URL") or os.environ.get("CELERY_BROKER_URL")
+
+# One client (and connection pool) per process; redis-py connects lazily and
+# resets the pool after a fork, so it's safe to create at import time
+redis_client = (
+    redis.from_url(REDIS_URL)
+    if REDIS_URL
+    else redis.Redis(host="localhost", port=6379, db=0)
+)
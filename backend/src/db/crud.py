@@ -1,38 +1,53 @@
 from datetime import datetime
+from urllib.parse import urlparse
 
 from schemas.definitions import App, AppField, Job, Review
 
 from .models import ApplicationORM, JobORM
 
 
-def job_to_orm(job: Job) -> JobORM:
-    """Convert Job dataclass to ORM model"""
+def job_host(job: Job) -> str | None:
+    """Host of the job's primary URL (direct URL first, then LinkedIn)"""
+    url = job.direct_job_url or job.linkedin_job_url
+    if not url:
+        return None
+    return urlparse(url).netloc or None
+
+
+def job_to_row(job: Job) -> dict:
+    """Convert Job dataclass to a column mapping (used for bulk inserts)"""
     date_posted = None
     if job.date_posted is not None:
         raw = str(job.date_posted).strip()
         if raw:
             date_posted = datetime.strptime(raw, "%Y-%m-%d").date()
 
-    return JobORM(
-        id=job.id,
-        jobspy_id=job.jobspy_id,
-        title=job.title,
-        company=job.company,
-        location=job.location,
-        min_salary=job.min_salary,
-        max_salary=job.max_salary,
-        date_posted=date_posted,
-        job_type=job.job_type,
-        linkedin_job_url=job.linkedin_job_url,
-        direct_job_url=job.direct_job_url,
-        description=job.description,
-        review=job.review.to_json() if job.review else None,
-        reviewed=job.reviewed,
-        approved=job.approved,
-        discarded=job.discarded,
-        manual=job.manual,
-        expired=job.expired,
-    )
+    return {
+        "id": job.id,
+        "jobspy_id": job.jobspy_id,
+        "title": job.title,
+        "company": job.company,
+        "location": job.location,
+        "min_salary": job.min_salary,
+        "max_salary": job.max_salary,
+        "date_posted": date_posted,
+        "job_type": job.job_type,
+        "linkedin_job_url": job.linkedin_job_url,
+        "direct_job_url": job.direct_job_url,
+        "host": job_host(job),
+        "description": job.description,
+        "review": job.review.to_json() if job.review else None,
+        "reviewed": job.reviewed,
+        "approved": job.approved,
+        "discarded": job.discarded,
+        "manual": job.manual,
+        "expired": job.expired,
+    }
+
+
+def job_to_orm(job: Job) -> JobORM:
+    """Convert Job dataclass to ORM model"""
+    return JobORM(**job_to_row(job))
 
 
 def orm_to_job(db_job: JobORM) -> Job:
@@ -1,20 +1,74 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List
 
-from sqlalchemy import JSON, UUID, Boolean, DateTime, Float, ForeignKey, String
+from sqlalchemy import (
+    JSON,
+    UUID,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _first_expiration_check() -> datetime:
+    # postings get a week before their first expiration check
+    return _utcnow() + timedelta(weeks=1)
+
+
 class JobORM(Base):
     __tablename__ = "jobs"
+    # Partial indexes backing the scheduler queue queries in db.utils.queries;
+    # (created_at, id) indexes back the newest-first keyset pages
+    __table_args__ = (
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index(
+            "ix_jobs_unreviewed",
+            "created_at",
+            postgresql_where=text("NOT reviewed AND NOT manual"),
+        ),
+        Index(
+            "ix_jobs_approved",
+            "id",
+            postgresql_where=text("reviewed AND approved AND NOT discarded"),
+        ),
+        Index(
+            "ix_jobs_unapproved",
+            "created_at",
+            "id",
+            postgresql_where=text("NOT approved AND NOT discarded AND NOT expired"),
+        ),
+        Index(
+            "ix_jobs_lease_expires_at",
+            "lease_expires_at",
+            postgresql_where=text("lease_expires_at IS NOT NULL"),
+        ),
+        Index("ix_jobs_updated_at", "updated_at"),
+        Index(
+            "ix_jobs_next_check_at",
+            "next_check_at",
+            postgresql_where=text("NOT expired AND linkedin_job_url IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    jobspy_id: Mapped[str] = mapped_column(String, nullable=False)
+    jobspy_id: Mapped[str] = mapped_column(
+        String, nullable=False, unique=True, index=True
+    )
     title: Mapped[str] = mapped_column(String, nullable=False)
     company: Mapped[str] = mapped_column(String, nullable=False)
     location: Mapped[str] = mapped_column(String, nullable=True)
@@ -23,7 +77,8 @@ class JobORM(Base):
     date_posted: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     job_type: Mapped[str] = mapped_column(String, nullable=True)
     linkedin_job_url: Mapped[str] = mapped_column(String, nullable=True)
-    direct_job_url: Mapped[str] = mapped_column(String, nullable=True)
+    direct_job_url: Mapped[str] = mapped_column(String, nullable=True, index=True)
+    host: Mapped[str] = mapped_column(String, nullable=True, index=True)
     description: Mapped[str] = mapped_column(String, nullable=True)
     review: Mapped[dict] = mapped_column(JSON, nullable=True)  # Store Review as JSON
     review_claim: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -34,13 +89,21 @@ class JobORM(Base):
     manual: Mapped[bool] = mapped_column(Boolean, default=False)
     expiration_check_claim: Mapped[bool] = mapped_column(Boolean, default=False)
     expired: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.now(timezone.utc)
+    # Expiration checks back off exponentially while a posting stays unchanged
+    next_check_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=_first_expiration_check
     )
+    unchanged_checks: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    claimed_by: Mapped[str] = mapped_column(String, nullable=True)
+    claimed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    lease_expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=_utcnow,
+        onupdate=_utcnow,
     )
 
     # Relationship
@@ -60,6 +123,7 @@ class JobORM(Base):
             "job_type": self.job_type,
             "linkedin_job_url": self.linkedin_job_url,
             "direct_job_url": self.direct_job_url,
+            "host": self.host,
             "description": self.description,
             "review": self.review,
             "review_claim": self.review_claim,
@@ -70,20 +134,69 @@ class JobORM(Base):
             "manual": self.manual,
             "expiration_check_claim": self.expiration_check_claim,
             "expired": self.expired,
+            "next_check_at": self.next_check_at,
+            "unchanged_checks": self.unchanged_checks,
+            "claimed_by": self.claimed_by,
+            "claimed_at": self.claimed_at,
+            "lease_expires_at": self.lease_expires_at,
         }
 
 
 class ApplicationORM(Base):
     __tablename__ = "applications"
+    # Partial indexes backing the scheduler queue queries in db.utils.queries;
+    # (created_at, id) indexes back the newest-first keyset pages
+    __table_args__ = (
+        Index(
+            "ix_applications_unprepared",
+            "created_at",
+            postgresql_where=text("NOT prepared"),
+        ),
+        Index(
+            "ix_applications_unapproved",
+            "created_at",
+            "id",
+            postgresql_where=text(
+                "prepared AND NOT approved AND NOT discarded AND NOT submitted"
+            ),
+        ),
+        Index(
+            "ix_applications_approved",
+            "created_at",
+            postgresql_where=text("approved AND NOT submitted"),
+        ),
+        Index(
+            "ix_applications_submitted",
+            "created_at",
+            postgresql_where=text("submitted"),
+        ),
+        Index(
+            "ix_applications_lease_expires_at",
+            "lease_expires_at",
+            postgresql_where=text("lease_expires_at IS NOT NULL"),
+        ),
+        Index("ix_applications_updated_at", "updated_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     job_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=False
+        UUID(as_uuid=True),
+        ForeignKey("jobs.id"),
+        nullable=False,
+        unique=True,
+        index=True,
     )
     url: Mapped[str] = mapped_column(String, nullable=False)
     fields: Mapped[dict] = mapped_column(JSON, nullable=True)  # Store AppFields as JSON
+    # Unit-normalized question embeddings aligned with fields (null where unanswered);
+    # deferred so ordinary app loads don't pull the vectors
+    field_embeddings: Mapped[list] = mapped_column(
+        JSON(none_as_null=True), nullable=True, deferred=True
+    )
+    # When field_embeddings were last stored; versions the answer example index
+    embeddings_updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     prepare_claim: Mapped[bool] = mapped_column(Boolean, default=False)
     prepared: Mapped[bool] = mapped_column(Boolean, default=False)
     approved: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -95,13 +208,14 @@ class ApplicationORM(Base):
     assessment: Mapped[bool] = mapped_column(Boolean, default=False)
     interview: Mapped[bool] = mapped_column(Boolean, default=False)
     rejected: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.now(timezone.utc)
-    )
+    claimed_by: Mapped[str] = mapped_column(String, nullable=True)
+    claimed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    lease_expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=_utcnow,
+        onupdate=_utcnow,
     )
 
     # Relationship
@@ -124,6 +238,9 @@ class ApplicationORM(Base):
             "assessment": self.assessment,
             "interview": self.interview,
             "rejected": self.rejected,
+            "claimed_by": self.claimed_by,
+            "claimed_at": self.claimed_at,
+            "lease_expires_at": self.lease_expires_at,
         }
 
 
@@ -135,9 +252,5 @@ class ErrorORM(Base):
     )
     error: Mapped[str] = mapped_column(String, nullable=False)
     operation: Mapped[str] = mapped_column(String, nullable=False)
-    error_time: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.now(timezone.utc)
-    )
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.now(timezone.utc)
-    )
+    error_time: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
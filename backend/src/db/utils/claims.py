@@ -1,125 +1,324 @@
 import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
 from db.crud import app_to_orm
 from db.models import ApplicationORM, JobORM
-from db.utils.queries import get_application_by_job_id
+from db.utils.queries import get_application_by_job_id, unclaimed
 from schemas.definitions import App, Job, Review
+from sqlalchemy import case, exists, select, update
+
+# Leases must outlive the Celery hard time limit so a live task never loses its
+# claim; tasks renew theirs when they start, since time spent queued counts too
+CLAIM_LEASE_SECONDS = int(os.environ.get("CLAIM_LEASE_SECONDS", str(60 * 15)))
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+# Batch API reviews finish within 24h; their leases must outlive that window
+REVIEW_BATCH_LEASE_SECONDS = 60 * 60 * 25
+
+# Open postings are rechecked after this long, doubling per unchanged check up to the max
+EXPIRATION_RECHECK_SECONDS = int(
+    os.environ.get("EXPIRATION_RECHECK_SECONDS", str(60 * 60 * 12))
+)
+EXPIRATION_RECHECK_MAX_SECONDS = int(
+    os.environ.get("EXPIRATION_RECHECK_MAX_SECONDS", str(60 * 60 * 24 * 8))
+)
+
+JOB_CLAIM_FLAGS = (
+    JobORM.review_claim,
+    JobORM.create_app_claim,
+    JobORM.expiration_check_claim,
+)
+APP_CLAIM_FLAGS = (ApplicationORM.prepare_claim, ApplicationORM.submission_claim)
+
+# stage -> (claim flag, filter for rows that still need the stage)
+CLAIM_STAGES = {
+    "review": (
+        JobORM.review_claim,
+        lambda: (JobORM.reviewed == False) & (JobORM.manual == False),
+    ),
+    "create_app": (
+        JobORM.create_app_claim,
+        lambda: ~exists().where(ApplicationORM.job_id == JobORM.id),
+    ),
+    "expiration_check": (
+        JobORM.expiration_check_claim,
+        lambda: (JobORM.expired == False) & (JobORM.linkedin_job_url != None),
+    ),
+    "prepare": (
+        ApplicationORM.prepare_claim,
+        lambda: ApplicationORM.prepared == False,
+    ),
+    "submission": (
+        ApplicationORM.submission_claim,
+        lambda: (ApplicationORM.approved == True) & (ApplicationORM.submitted == False),
+    ),
+}
+
+
+def _claim_flags(orm):
+    return JOB_CLAIM_FLAGS if orm is JobORM else APP_CLAIM_FLAGS
+
+
+def _held(orm, claim_token: str | None) -> tuple:
+    """Criteria limiting an UPDATE to rows still leased under claim_token.
+
+    None skips the check, for callers that don't track tokens.
+    """
+    return () if claim_token is None else (orm.claimed_by == claim_token,)
 
 
-def claim_job_for_review(db_session, job_id: UUID) -> bool:
-    """Atomically claim a job for review.
+def _untouched(orm) -> dict:
+    """SET updated_at to itself, so lease bookkeeping doesn't count as a change.
 
-    Returns True if the claim succeeded (job transitioned to review_claim=True),
-    False if the job is already reviewed or currently being reviewed.
+    updated_at drives incremental pulls (since=); only content changes should
+    bump it.
     """
-    updated = (
-        db_session.query(JobORM)
-        .filter(
-            JobORM.id == job_id,
-            JobORM.reviewed == False,
-            JobORM.review_claim == False,
-        )
-        .update({JobORM.review_claim: True}, synchronize_session=False)
+    return {orm.updated_at: orm.updated_at}
+
+
+def _release_values(orm, *flags) -> dict:
+    values = {flag: False for flag in flags}
+    values.update(
+        {orm.claimed_by: None, orm.claimed_at: None, orm.lease_expires_at: None}
+    )
+    return values
+
+
+def _claim(
+    db_session,
+    stage: str,
+    *criteria,
+    ids=None,
+    limit=None,
+    order_by=None,
+    lease_seconds: int = CLAIM_LEASE_SECONDS,
+) -> list:
+    """Lease rows for a stage in a single UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED).
+
+    A row can only be leased by one stage at a time. Claiming sets the stage's
+    flag and clears any stale flags left behind by an expired lease.
+    Returns the claimed rows (id, plus job_id for applications), each with the
+    claim token (claimed_by) that tasks pass back to renew and release it.
+    """
+    if stage not in CLAIM_STAGES:
+        raise ValueError(f"Unknown claim stage: {stage}")
+
+    flag, stage_filter = CLAIM_STAGES[stage]
+    orm = flag.class_
+    now = datetime.now(timezone.utc)
+    claim_token = f"{WORKER_ID}:{uuid.uuid4().hex}"
+
+    candidates = (
+        select(orm.id)
+        .where(stage_filter(), unclaimed(orm, now), *criteria)
+        .order_by(order_by if order_by is not None else orm.created_at)
+        .with_for_update(skip_locked=True)
+    )
+    if ids is not None:
+        candidates = candidates.where(orm.id.in_(ids))
+    if limit is not None:
+        candidates = candidates.limit(limit)
+
+    values = {f: f is flag for f in _claim_flags(orm)}
+    values.update(
+        {
+            orm.claimed_by: claim_token,
+            orm.claimed_at: now,
+            orm.lease_expires_at: now + timedelta(seconds=lease_seconds),
+            **_untouched(orm),
+        }
+    )
+    returning = (
+        (orm.id, orm.job_id, orm.claimed_by)
+        if orm is ApplicationORM
+        else (orm.id, orm.claimed_by)
     )
-    if updated:
-        db_session.commit()
-        return True
-    return False
 
+    claimed = db_session.execute(
+        update(orm)
+        .where(orm.id.in_(candidates))
+        .values(values)
+        .returning(*returning)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db_session.commit()
+    logging.debug(f"Claimed {len(claimed)} rows for {stage}")
+    return claimed
+
+
+def claim_next(
+    db_session,
+    n: int,
+    stage: str,
+    *criteria,
+    order_by=None,
+    lease_seconds: int = CLAIM_LEASE_SECONDS,
+) -> list:
+    """Lease up to n rows that still need the given stage, oldest first.
+
+    Extra SQLAlchemy criteria narrow the queue further (e.g. a minimum age);
+    order_by replaces the created_at ordering.
+    Rows locked by a concurrent claim are skipped rather than waited on.
+    """
+    return _claim(
+        db_session,
+        stage,
+        *criteria,
+        limit=n,
+        order_by=order_by,
+        lease_seconds=lease_seconds,
+    )
+
+
+def claim_ids(db_session, stage: str, ids: list[UUID]) -> list:
+    """Lease the given rows for a stage, skipping any that are already leased."""
+    if not ids:
+        return []
+    return _claim(db_session, stage, ids=ids)
 
-def claim_job_for_app_creation(db_session, job_id: UUID) -> bool:
-    """Atomically claim a job for application creation.
 
-    Returns True if the claim succeeded (job transitioned to create_app_claim=True),
-    False if an app for the job is already created or currently being created.
+def renew_claims(
+    db_session,
+    stage: str,
+    ids: list[UUID],
+    claim_token: str,
+    lease_seconds: int = CLAIM_LEASE_SECONDS,
+) -> set:
+    """Restart the lease on rows still held under claim_token and still needing the stage.
+
+    Tasks call this when they start: a lease that ran out while the task was
+    queued may have been reaped and re-claimed, or the row finished by another
+    task. Returns the ids the caller may go on to process.
     """
-    updated = (
-        db_session.query(JobORM)
+    if not ids:
+        return set()
+    flag, stage_filter = CLAIM_STAGES[stage]
+    orm = flag.class_
+    now = datetime.now(timezone.utc)
+    renewed = db_session.execute(
+        update(orm)
+        .where(
+            orm.id.in_(ids),
+            flag == True,
+            orm.claimed_by == claim_token,
+            stage_filter(),
+        )
+        .values(
+            {
+                orm.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                **_untouched(orm),
+            }
+        )
+        .returning(orm.id)
+        .execution_options(synchronize_session=False)
+    ).scalars()
+    renewed = set(renewed)
+    # rows finished by another task while this one was queued: just let go
+    (
+        db_session.query(orm)
         .filter(
-            JobORM.id == job_id,
-            JobORM.create_app_claim == False,
+            orm.id.in_(ids),
+            flag == True,
+            orm.claimed_by == claim_token,
+            ~stage_filter(),
+        )
+        .update(
+            {**_release_values(orm, flag), **_untouched(orm)},
+            synchronize_session=False,
         )
-        .update({JobORM.create_app_claim: True}, synchronize_session=False)
     )
-    if updated:
-        db_session.commit()
-        return True
-    return False
+    db_session.commit()
+    if len(renewed) < len(ids):
+        logging.warning(
+            f"{len(ids) - len(renewed)} {stage} claims lost or already done; skipping"
+        )
+    return renewed
+
+
+def reap_expired_claims(db_session) -> int:
+    """Release claims whose lease expired (e.g. the worker crashed mid-task)."""
+    now = datetime.now(timezone.utc)
+    reaped = 0
+    for orm in (JobORM, ApplicationORM):
+        reaped += (
+            db_session.query(orm)
+            .filter(orm.lease_expires_at < now)
+            .update(
+                {**_release_values(orm, *_claim_flags(orm)), **_untouched(orm)},
+                synchronize_session=False,
+            )
+        )
+    db_session.commit()
+    if reaped:
+        logging.warning(f"Released {reaped} expired claims")
+    return reaped
+
+
+def claim_job_for_review(db_session, job_id: UUID) -> str | None:
+    """Atomically claim a job for review.
+
+    Returns the claim token if the claim succeeded (job leased with review_claim=True),
+    None if the job is already reviewed or currently claimed.
+    """
+    claimed = claim_ids(db_session, "review", [job_id])
+    return claimed[0].claimed_by if claimed else None
+
 
+def claim_job_for_app_creation(db_session, job_id: UUID) -> str | None:
+    """Atomically claim a job for application creation.
+
+    Returns the claim token if the claim succeeded (job leased with create_app_claim=True),
+    None if an app for the job is already created or the job is currently claimed.
+    """
+    claimed = claim_ids(db_session, "create_app", [job_id])
+    return claimed[0].claimed_by if claimed else None
 
-def claim_job_for_expiration_check(db_session, job_id: UUID) -> bool:
+
+def claim_job_for_expiration_check(db_session, job_id: UUID) -> str | None:
     """Atomically claim a job for expiration check.
 
-    Returns True if the claim succeeded (job transitioned to expiration_check_claim=True),
-    False if the job is already expired or currently being checked for expiration.
+    Returns the claim token if the claim succeeded (job leased with expiration_check_claim=True),
+    None if the job is already expired or currently claimed.
     """
-    updated = (
-        db_session.query(JobORM)
-        .filter(
-            JobORM.id == job_id,
-            JobORM.expiration_check_claim == False,
-        )
-        .update({JobORM.expiration_check_claim: True}, synchronize_session=False)
-    )
-    if updated:
-        db_session.commit()
-        return True
-    return False
+    claimed = claim_ids(db_session, "expiration_check", [job_id])
+    return claimed[0].claimed_by if claimed else None
 
 
-def claim_app_for_prep(db_session, app_id: UUID) -> bool:
+def claim_app_for_prep(db_session, app_id: UUID) -> str | None:
     """Atomically claim an app for preparation.
 
-    Returns True if the claim succeeded (app transitioned to prepare_claim=True),
-    False if the app is already prepared or currently being prepared.
+    Returns the claim token if the claim succeeded (app leased with prepare_claim=True),
+    None if the app is already prepared or currently claimed.
     """
-    updated = (
-        db_session.query(ApplicationORM)
-        .filter(
-            ApplicationORM.id == app_id,
-            ApplicationORM.prepared == False,
-            ApplicationORM.prepare_claim == False,
-        )
-        .update({ApplicationORM.prepare_claim: True}, synchronize_session=False)
-    )
-    if updated:
-        db_session.commit()
-        return True
-    return False
+    claimed = claim_ids(db_session, "prepare", [app_id])
+    return claimed[0].claimed_by if claimed else None
 
 
-def claim_app_for_submission(db_session, app_id: UUID) -> bool:
+def claim_app_for_submission(db_session, app_id: UUID) -> str | None:
     """Atomically claim a app for submission.
 
-    Returns True if the claim succeeded (record transitioned to submission_claim=True),
-    False if the app is already submitted or currently being submitted.
+    Returns the claim token if the claim succeeded (app leased with submission_claim=True),
+    None if the app is already submitted or currently claimed.
     """
-    updated = (
-        db_session.query(ApplicationORM)
-        .filter(
-            ApplicationORM.id == app_id,
-            ApplicationORM.submitted == False,
-            ApplicationORM.submission_claim == False,
-        )
-        .update({ApplicationORM.submission_claim: True}, synchronize_session=False)
-    )
-    if updated:
-        db_session.commit()
-        return True
-    return False
+    claimed = claim_ids(db_session, "submission", [app_id])
+    return claimed[0].claimed_by if claimed else None
 
 
-def set_job_reviewed(db_session, job_id: UUID, review: Review):
-    """Mark a job reviewed and clear review_claim flag."""
+def set_job_reviewed(
+    db_session, job_id: UUID, review: Review, claim_token: str | None = None
+):
+    """Mark a job reviewed and release its review claim."""
     (
         db_session.query(JobORM)
-        .filter(JobORM.id == job_id)
+        .filter(JobORM.id == job_id, *_held(JobORM, claim_token))
         .update(
             {
                 JobORM.reviewed: True,
-                JobORM.review_claim: False,
                 JobORM.review: review.to_json(),
+                **_release_values(JobORM, JobORM.review_claim),
             },
             synchronize_session=False,
         )
@@ -128,13 +327,16 @@ def set_job_reviewed(db_session, job_id: UUID, review: Review):
     logging.debug(f"Job {job_id} marked reviewed and claim cleared")
 
 
-def set_job_expired(db_session, job_id: UUID):
-    """Mark a job expired and clear expiration_check_claim flag."""
+def set_job_expired(db_session, job_id: UUID, claim_token: str | None = None):
+    """Mark a job expired and release its expiration check claim."""
     (
         db_session.query(JobORM)
-        .filter(JobORM.id == job_id)
+        .filter(JobORM.id == job_id, *_held(JobORM, claim_token))
         .update(
-            {JobORM.expired: True, JobORM.expiration_check_claim: False},
+            {
+                JobORM.expired: True,
+                **_release_values(JobORM, JobORM.expiration_check_claim),
+            },
             synchronize_session=False,
         )
     )
@@ -142,8 +344,84 @@ def set_job_expired(db_session, job_id: UUID):
     logging.debug(f"Job {job_id} marked expired and claim cleared")
 
 
-def set_job_app_created(db_session, app: App):
-    """Atomically upsert the application and clear the job's create_app_claim.
+def _recheck_delays() -> list[int]:
+    """Seconds until the next expiration check, indexed by unchanged check count."""
+    delays = [EXPIRATION_RECHECK_SECONDS]
+    while delays[-1] < EXPIRATION_RECHECK_MAX_SECONDS:
+        delays.append(min(delays[-1] * 2, EXPIRATION_RECHECK_MAX_SECONDS))
+    return delays
+
+
+def set_jobs_expiration_checked(
+    db_session,
+    job_ids,
+    expired_ids=(),
+    unchanged_ids=(),
+    changed_ids=(),
+    claim_token: str | None = None,
+):
+    """Record an expiration sweep and release its claims in one UPDATE.
+
+    Jobs in expired_ids are marked expired. Unchanged jobs back off
+    exponentially; changed jobs go back to the shortest recheck delay. Any
+    other job (e.g. its check failed) keeps its back-off and is retried after
+    the shortest delay.
+    """
+    if not job_ids:
+        return
+    expired_ids, unchanged_ids, changed_ids = (
+        list(expired_ids),
+        list(unchanged_ids),
+        list(changed_ids),
+    )
+    now = datetime.now(timezone.utc)
+    delays = _recheck_delays()
+    last = len(delays) - 1
+    backed_off = case(
+        {checks: now + timedelta(seconds=delays[checks + 1]) for checks in range(last)},
+        value=JobORM.unchanged_checks,
+        else_=now + timedelta(seconds=delays[last]),
+    )
+
+    (
+        db_session.query(JobORM)
+        .filter(JobORM.id.in_(job_ids), *_held(JobORM, claim_token))
+        .update(
+            {
+                JobORM.expired: case(
+                    (JobORM.id.in_(expired_ids), True), else_=JobORM.expired
+                ),
+                JobORM.unchanged_checks: case(
+                    (
+                        JobORM.id.in_(unchanged_ids),
+                        case(
+                            (JobORM.unchanged_checks >= last, last),
+                            else_=JobORM.unchanged_checks + 1,
+                        ),
+                    ),
+                    (JobORM.id.in_(changed_ids), 0),
+                    else_=JobORM.unchanged_checks,
+                ),
+                JobORM.next_check_at: case(
+                    (JobORM.id.in_(unchanged_ids), backed_off),
+                    else_=now + timedelta(seconds=delays[0]),
+                ),
+                JobORM.updated_at: case(
+                    (JobORM.id.in_(expired_ids), now), else_=JobORM.updated_at
+                ),
+                **_release_values(JobORM, JobORM.expiration_check_claim),
+            },
+            synchronize_session=False,
+        )
+    )
+    db_session.commit()
+    logging.debug(
+        f"{len(expired_ids)} of {len(job_ids)} jobs marked expired and claims cleared"
+    )
+
+
+def set_job_app_created(db_session, app: App, claim_token: str | None = None):
+    """Atomically upsert the application and release the job's create_app claim.
 
     If an application already exists for the job, update it; otherwise insert a new one.
     Both the application write and clearing the job claim are committed together.
@@ -167,8 +445,14 @@ def set_job_app_created(db_session, app: App):
 
         (
             db_session.query(JobORM)
-            .filter(JobORM.id == app.job_id)
-            .update({JobORM.create_app_claim: False}, synchronize_session=False)
+            .filter(JobORM.id == app.job_id, *_held(JobORM, claim_token))
+            .update(
+                {
+                    **_release_values(JobORM, JobORM.create_app_claim),
+                    **_untouched(JobORM),
+                },
+                synchronize_session=False,
+            )
         )
 
         db_session.commit()
@@ -178,16 +462,20 @@ def set_job_app_created(db_session, app: App):
         raise
 
 
-def set_app_prepared(db_session, app_id: UUID, updated_app: App):
-    """Mark an application prepared and clear prepare_claim flag."""
+def set_app_prepared(
+    db_session, app_id: UUID, updated_app: App, claim_token: str | None = None
+):
+    """Mark an application prepared and release its prepare claim."""
     (
         db_session.query(ApplicationORM)
-        .filter(ApplicationORM.id == app_id)
+        .filter(ApplicationORM.id == app_id, *_held(ApplicationORM, claim_token))
         .update(
             {
                 ApplicationORM.prepared: True,
-                ApplicationORM.prepare_claim: False,
-                ApplicationORM.fields: updated_app.fields,
+                ApplicationORM.fields: [
+                    field.to_json() for field in updated_app.fields
+                ],
+                **_release_values(ApplicationORM, ApplicationORM.prepare_claim),
             },
             synchronize_session=False,
         )
@@ -196,68 +484,114 @@ def set_app_prepared(db_session, app_id: UUID, updated_app: App):
     logging.debug(f"App {app_id} marked prepared and claim cleared")
 
 
-def set_app_submitted(db_session, app_id: UUID):
-    """Mark a app submitted and clear submission_claim flag."""
+def set_app_submitted(db_session, app_id: UUID, claim_token: str | None = None):
+    """Mark a app submitted and release its submission claim.
+
+    The submission happened, so it is recorded even if the claim was lost.
+    """
     (
         db_session.query(ApplicationORM)
         .filter(ApplicationORM.id == app_id)
+        .update({ApplicationORM.submitted: True}, synchronize_session=False)
+    )
+    (
+        db_session.query(ApplicationORM)
+        .filter(ApplicationORM.id == app_id, *_held(ApplicationORM, claim_token))
         .update(
-            {ApplicationORM.submitted: True, ApplicationORM.submission_claim: False},
+            {
+                **_release_values(ApplicationORM, ApplicationORM.submission_claim),
+                **_untouched(ApplicationORM),
+            },
             synchronize_session=False,
         )
     )
     db_session.commit()
 
 
-def clear_job_review_claim(db_session, job_id: UUID):
-    """Clear review_claim flag without marking reviewed."""
+def clear_job_review_claim(db_session, job_id: UUID, claim_token: str | None = None):
+    """Release the review claim without marking reviewed."""
     (
         db_session.query(JobORM)
-        .filter(JobORM.id == job_id)
-        .update({JobORM.review_claim: False}, synchronize_session=False)
+        .filter(JobORM.id == job_id, *_held(JobORM, claim_token))
+        .update(
+            {**_release_values(JobORM, JobORM.review_claim), **_untouched(JobORM)},
+            synchronize_session=False,
+        )
     )
     db_session.commit()
     logging.debug(f"Job {job_id} review claim cleared")
 
 
-def clear_job_expiration_claim(db_session, job_id: UUID):
-    """Clear expiration_check_claim flag without marking expired."""
+def clear_job_expiration_claim(
+    db_session, job_id: UUID, claim_token: str | None = None
+):
+    """Release the expiration check claim without marking expired."""
     (
         db_session.query(JobORM)
-        .filter(JobORM.id == job_id)
-        .update({JobORM.expiration_check_claim: False}, synchronize_session=False)
+        .filter(JobORM.id == job_id, *_held(JobORM, claim_token))
+        .update(
+            {
+                **_release_values(JobORM, JobORM.expiration_check_claim),
+                **_untouched(JobORM),
+            },
+            synchronize_session=False,
+        )
     )
     db_session.commit()
     logging.debug(f"Job {job_id} expiration check claim cleared")
 
 
-def clear_job_app_creation_claim(db_session, job_id: UUID):
-    """Clear create_app_claim flag without creating an application."""
+def clear_job_app_creation_claim(
+    db_session, job_id: UUID, claim_token: str | None = None
+):
+    """Release the create_app claim without creating an application."""
     (
         db_session.query(JobORM)
-        .filter(JobORM.id == job_id)
-        .update({JobORM.create_app_claim: False}, synchronize_session=False)
+        .filter(JobORM.id == job_id, *_held(JobORM, claim_token))
+        .update(
+            {
+                **_release_values(JobORM, JobORM.create_app_claim),
+                **_untouched(JobORM),
+            },
+            synchronize_session=False,
+        )
     )
     db_session.commit()
     logging.debug(f"Job {job_id} app creation claim cleared")
 
 
-def clear_app_preparation_claim(db_session, app_id: UUID):
-    """Clear prepare_claim flag without marking prepared."""
+def clear_app_preparation_claim(
+    db_session, app_id: UUID, claim_token: str | None = None
+):
+    """Release the prepare claim without marking prepared."""
     (
         db_session.query(ApplicationORM)
-        .filter(ApplicationORM.id == app_id)
-        .update({ApplicationORM.prepare_claim: False}, synchronize_session=False)
+        .filter(ApplicationORM.id == app_id, *_held(ApplicationORM, claim_token))
+        .update(
+            {
+                **_release_values(ApplicationORM, ApplicationORM.prepare_claim),
+                **_untouched(ApplicationORM),
+            },
+            synchronize_session=False,
+        )
     )
     db_session.commit()
     logging.debug(f"App {app_id} preparation claim cleared")
 
 
-def clear_app_submission_claim(db_session, app_id: UUID):
-    """Clear submission_claim flag without marking submitted."""
+def clear_app_submission_claim(
+    db_session, app_id: UUID, claim_token: str | None = None
+):
+    """Release the submission claim without marking submitted."""
     (
         db_session.query(ApplicationORM)
-        .filter(ApplicationORM.id == app_id)
-        .update({ApplicationORM.submission_claim: False}, synchronize_session=False)
+        .filter(ApplicationORM.id == app_id, *_held(ApplicationORM, claim_token))
+        .update(
+            {
+                **_release_values(ApplicationORM, ApplicationORM.submission_claim),
+                **_untouched(ApplicationORM),
+            },
+            synchronize_session=False,
+        )
     )
     db_session.commit()
@@ -1,15 +1,27 @@
 import logging
+from datetime import datetime, timezone
 from uuid import UUID
 
-from db.crud import app_to_orm, job_to_orm, orm_to_app, orm_to_job
+from db.crud import (
+    app_to_orm,
+    job_host,
+    job_to_orm,
+    job_to_row,
+    orm_to_app,
+    orm_to_job,
+)
 from db.models import ApplicationORM, JobORM
 from schemas.definitions import App, AppFragment, Job
+from sqlalchemy.dialects.postgresql import insert
 
 
 def update_job_by_id(db_session, job_id, updated_job: Job):
     """Update a job by its ID."""
     job_orm = db_session.query(JobORM).filter(JobORM.id == job_id).first()
     if job_orm:
+        if updated_job.linkedin_job_url != job_orm.linkedin_job_url:
+            job_orm.next_check_at = datetime.now(timezone.utc)
+            job_orm.unchanged_checks = 0
         for key, value in updated_job.__dict__.items():
             if (
                 key == "id"
@@ -25,9 +37,29 @@ def update_job_by_id(db_session, job_id, updated_job: Job):
                 except Exception:
                     value = getattr(value, "__dict__", value)
             setattr(job_orm, key, value)
+        job_orm.host = job_host(updated_job)
         db_session.commit()
 
 
+def request_expiration_check(db_session, job_id):
+    """Make a job due for an expiration check now, e.g. after its posting changed."""
+    (
+        db_session.query(JobORM)
+        .filter(JobORM.id == job_id)
+        .update(
+            {
+                JobORM.next_check_at: datetime.now(timezone.utc),
+                JobORM.unchanged_checks: 0,
+                # scheduling only; keep it out of incremental pulls
+                JobORM.updated_at: JobORM.updated_at,
+            },
+            synchronize_session=False,
+        )
+    )
+    db_session.commit()
+    logging.debug(f"Job {job_id} due for expiration check")
+
+
 def approve_job_by_id(db_session, job_id):
     """Approve a job by its ID."""
     job = db_session.query(JobORM).filter(JobORM.id == job_id).first()
@@ -58,6 +90,8 @@ def update_application_by_id(db_session, app_id, updated_app: App):
             elif key == "fields":
                 fields = [field.__dict__ for field in value]
                 setattr(app, key, fields)
+                # re-embedded on the next embedding pass
+                app.field_embeddings = None
             else:
                 setattr(app, key, value)
         db_session.commit()
@@ -101,6 +135,8 @@ def update_application_by_id_with_fragment(db_session, app_id, fragment: AppFrag
             elif key == "fields":
                 fields = [field.__dict__ for field in value]
                 setattr(app, key, fields)
+                # re-embedded on the next embedding pass
+                app.field_embeddings = None
             else:
                 setattr(app, key, value)
         db_session.commit()
@@ -117,6 +153,25 @@ def approve_application_by_id(db_session, app_id):
     logging.debug(f"App {app_id} approved")
 
 
+def set_app_field_embeddings(db_session, app_id, embeddings: list):
+    """Store question embeddings aligned with an application's fields."""
+    (
+        db_session.query(ApplicationORM)
+        .filter(ApplicationORM.id == app_id)
+        .update(
+            {
+                ApplicationORM.field_embeddings: embeddings,
+                ApplicationORM.embeddings_updated_at: datetime.now(timezone.utc),
+                # derived data, not part of the pulled JSON
+                ApplicationORM.updated_at: ApplicationORM.updated_at,
+            },
+            synchronize_session=False,
+        )
+    )
+    db_session.commit()
+    logging.debug(f"App {app_id} field embeddings updated")
+
+
 def discard_application_by_id(db_session, app_id):
     """Set the discarded field to True."""
     app = db_session.query(ApplicationORM).filter(ApplicationORM.id == app_id).first()
@@ -127,30 +182,104 @@ def discard_application_by_id(db_session, app_id):
     logging.debug(f"App {app_id} discarded")
 
 
+def _same_listing(a: Job, b: Job) -> bool:
+    # a posting found on several sites keeps its direct URL, company and title
+    return (
+        a.direct_job_url == b.direct_job_url
+        and a.company.strip().lower() == b.company.strip().lower()
+        and a.title.strip().lower() == b.title.strip().lower()
+    )
+
+
 def add_new_scraped_jobs(db_session, new_jobs: list[Job]) -> list[Job]:
-    """Add newly scraped jobs to the database."""
-    added_jobs = []
-    num_new_jobs = 0
+    """Add newly scraped jobs to the database.
+
+    Inserts the whole batch with a single INSERT ... ON CONFLICT DO NOTHING on
+    jobspy_id, then loads the rows that already existed with one query.
+    Listings of a posting already stored from another site (or search) are
+    not inserted again; the stored job is returned instead.
+    Returns one job per listing, in order, with duplicates mapped to the job
+    that was kept for them.
+    """
+    # dedupe within the batch, keeping the first listing for each jobspy_id and
+    # for each posting; kept maps every jobspy_id to the one kept for it
+    unique_jobs: dict[str, Job] = {}
+    kept: dict[str, str] = {}
+    by_url: dict[str, list[Job]] = {}
     for job in new_jobs:
-        job_orm = job_to_orm(job)
+        if job.jobspy_id in kept:
+            continue
+        if job.direct_job_url:
+            same = next(
+                (
+                    seen
+                    for seen in by_url.get(job.direct_job_url, [])
+                    if _same_listing(job, seen)
+                ),
+                None,
+            )
+            if same is not None:
+                kept[job.jobspy_id] = same.jobspy_id
+                continue
+            by_url.setdefault(job.direct_job_url, []).append(job)
+        unique_jobs[job.jobspy_id] = job
+        kept[job.jobspy_id] = job.jobspy_id
+    if not unique_jobs:
+        return []
 
-        # check if job already exists
-        existing_job = (
+    # cross-site duplicates stored by earlier batches, matched by direct URL
+    duplicates: dict[str, Job] = {}
+    if by_url:
+        for job_orm in (
             db_session.query(JobORM)
-            .filter(JobORM.jobspy_id == job_orm.jobspy_id)
-            .first()
+            .filter(
+                JobORM.direct_job_url.in_(list(by_url)),
+                JobORM.jobspy_id.notin_(list(unique_jobs)),
+            )
+            .all()
+        ):
+            stored = orm_to_job(job_orm)
+            for job in by_url[stored.direct_job_url]:
+                if _same_listing(job, stored):
+                    duplicates.setdefault(job.jobspy_id, stored)
+
+    to_insert = [job for jid, job in unique_jobs.items() if jid not in duplicates]
+    inserted_ids = set()
+    if to_insert:
+        inserted_ids = set(
+            db_session.execute(
+                insert(JobORM)
+                .values([job_to_row(job) for job in to_insert])
+                .on_conflict_do_nothing(index_elements=[JobORM.jobspy_id])
+                .returning(JobORM.jobspy_id)
+            ).scalars()
+        )
+
+    # If job exists, return the stored version instead
+    existing_ids = [
+        job.jobspy_id for job in to_insert if job.jobspy_id not in inserted_ids
+    ]
+    existing_jobs = dict(duplicates)
+    if existing_ids:
+        existing_jobs.update(
+            {
+                job_orm.jobspy_id: orm_to_job(job_orm)
+                for job_orm in db_session.query(JobORM)
+                .filter(JobORM.jobspy_id.in_(existing_ids))
+                .all()
+            }
         )
-        if existing_job:
-            # If job exists, do nothing
-            added_jobs.append(orm_to_job(existing_job))
-            continue
-        else:
-            num_new_jobs += 1
-            added_jobs.append(job)
-            db_session.add(job_orm)
     db_session.commit()
 
-    logging.critical(f"{num_new_jobs} new jobs added to the database!")
+    added_jobs = []
+    for job in new_jobs:
+        jid = kept[job.jobspy_id]
+        if jid in inserted_ids:
+            added_jobs.append(unique_jobs[jid])
+        elif jid in existing_jobs:
+            added_jobs.append(existing_jobs[jid])
+
+    logging.critical(f"{len(inserted_ids)} new jobs added to the database!")
     return added_jobs
 
 
@@ -1,10 +1,170 @@
+import base64
 import logging
-from datetime import timezone
+from datetime import datetime, timezone
 from uuid import UUID
 
 from db.crud import app_to_orm, job_to_orm, orm_to_app, orm_to_job
 from db.models import ApplicationORM, JobORM
-from schemas.definitions import App, AppFragment, Job
+from schemas.definitions import App, AppField, AppFragment, Job
+from sqlalchemy import case, func, literal, or_, true, tuple_
+
+# Columns that list endpoints may project with fields=
+JOB_LIST_FIELDS = (
+    "id",
+    "jobspy_id",
+    "title",
+    "company",
+    "location",
+    "min_salary",
+    "max_salary",
+    "date_posted",
+    "job_type",
+    "linkedin_job_url",
+    "direct_job_url",
+    "description",
+    "review",
+    "reviewed",
+    "approved",
+    "discarded",
+    "manual",
+    "expired",
+)
+APP_LIST_FIELDS = (
+    "id",
+    "job_id",
+    "url",
+    "fields",
+    "prepared",
+    "approved",
+    "discarded",
+    "referred",
+    "submitted",
+    "acknowledged",
+    "assessment",
+    "interview",
+    "rejected",
+)
+
+
+def unclaimed(orm, now: datetime | None = None):
+    """Filter for rows that are not under an active claim lease."""
+    now = now or datetime.now(timezone.utc)
+    return or_(orm.lease_expires_at == None, orm.lease_expires_at < now)
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor from encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        created_at, row_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _jsonable(key: str, value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d") if key == "date_posted" else value.isoformat()
+    return value
+
+
+def _get_page(
+    db_session, orm, criteria, *, to_json, allowed_fields, cursor, limit, fields
+):
+    """Fetch one page of rows ordered newest first, keyed on (created_at, id).
+
+    With fields, only those columns are selected and returned; otherwise each
+    row is converted with to_json. Returns (items, next_cursor), where
+    next_cursor is None on the last page.
+    """
+    if fields:
+        unknown = set(fields) - set(allowed_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        columns = {"id", "created_at", *fields}
+        query = db_session.query(*[getattr(orm, column) for column in columns])
+    else:
+        query = db_session.query(orm)
+
+    query = query.filter(criteria)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(orm.created_at, orm.id) < tuple_(created_at, row_id)
+        )
+    query = query.order_by(orm.created_at.desc(), orm.id.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    if fields:
+        items = [{f: _jsonable(f, getattr(row, f)) for f in fields} for row in rows]
+    else:
+        items = [to_json(row) for row in rows]
+    return items, next_cursor
+
+
+def get_jobs_page(db_session, *, cursor=None, limit=None, fields=None):
+    """Fetch a page of all jobs, newest first."""
+    return _get_page(
+        db_session,
+        JobORM,
+        true(),
+        to_json=lambda job: orm_to_job(job).to_json(),
+        allowed_fields=JOB_LIST_FIELDS,
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+    )
+
+
+def get_unapproved_jobs_page(db_session, *, cursor=None, limit=None, fields=None):
+    """Fetch a page of unapproved jobs, newest first."""
+    return _get_page(
+        db_session,
+        JobORM,
+        (JobORM.approved == False)
+        & (JobORM.discarded == False)
+        & (JobORM.expired == False),
+        to_json=lambda job: orm_to_job(job).to_json(),
+        allowed_fields=JOB_LIST_FIELDS,
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+    )
+
+
+def get_unapproved_applications_page(
+    db_session, *, cursor=None, limit=None, fields=None
+):
+    """Fetch a page of unapproved applications, newest first."""
+    return _get_page(
+        db_session,
+        ApplicationORM,
+        (ApplicationORM.prepared == True)
+        & (ApplicationORM.approved == False)
+        & (ApplicationORM.discarded == False)
+        & (ApplicationORM.submitted == False),
+        to_json=lambda app: orm_to_app(app).to_json(),
+        allowed_fields=APP_LIST_FIELDS,
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+    )
 
 
 def get_job_by_id(db_session, job_id) -> Job:
@@ -15,71 +175,33 @@ def get_job_by_id(db_session, job_id) -> Job:
     return orm_to_job(orm)
 
 
-def get_unapproved_jobs(db_session) -> list[Job]:
-    """Fetch all unapproved jobs."""
-    jobs = (
-        db_session.query(JobORM)
-        .filter(
-            (JobORM.approved == False)
-            & (JobORM.discarded == False)
-            & (JobORM.expired == False)
-        )
-        .order_by(JobORM.created_at.desc())
-        .all()
-    )
-    return [orm_to_job(job) for job in jobs]
-
-
-def get_unreviewed_jobs(db_session) -> list[Job]:
-    """Fetch all unreviewed jobs."""
-    jobs = (
-        db_session.query(JobORM)
-        .filter(
-            (JobORM.reviewed == False)
-            & (JobORM.manual == False)
-            & (JobORM.review_claim == False)
-        )
-        .all()
-    )
+def get_jobs_by_ids(db_session, job_ids) -> list[Job]:
+    """Fetch the jobs with the given IDs in one query."""
+    jobs = db_session.query(JobORM).filter(JobORM.id.in_(job_ids)).all()
     return [orm_to_job(job) for job in jobs]
 
 
-def get_reviewed_jobs(db_session) -> list[Job]:
-    """Fetch all reviewed jobs that do not have an associated application."""
-    # Get job_ids that have an associated application
-    app_job_ids = db_session.query(ApplicationORM.job_id).distinct()
-    jobs = (
-        db_session.query(JobORM)
-        .filter(
-            (JobORM.reviewed == True)
-            & (~JobORM.id.in_(app_job_ids))
-            & (JobORM.create_app_claim == False)
-        )
-        .all()
+def _approved_without_app() -> tuple:
+    # the predicate of ix_jobs_approved, plus no application yet
+    return (
+        JobORM.reviewed,
+        JobORM.approved,
+        ~JobORM.discarded,
+        ~JobORM.applications.any(),
     )
-    return [orm_to_job(job) for job in jobs]
 
 
-def get_unexpired_jobs_older_than_one_week(db_session) -> list[Job]:
-    """Fetch all jobs older than one week that are unexpired."""
-    from datetime import datetime, timedelta
+def get_approved_jobs_without_app(db_session) -> list:
+    """Fetch (id, direct_job_url, linkedin_job_url) of approved jobs that have no application yet.
 
-    one_week_ago = datetime.now(timezone.utc) - timedelta(weeks=1)
-    jobs = (
-        db_session.query(JobORM)
-        .filter(
-            (JobORM.created_at < one_week_ago)
-            & (JobORM.expired == False)
-            & (JobORM.expiration_check_claim == False)
-        )
+    Backed by ix_jobs_approved, whose predicate matches the filter; only the
+    columns needed to dispatch app creation are loaded.
+    """
+    return (
+        db_session.query(JobORM.id, JobORM.direct_job_url, JobORM.linkedin_job_url)
+        .filter(*_approved_without_app(), unclaimed(JobORM))
         .all()
     )
-    return [orm_to_job(job) for job in jobs]
-
-
-def get_all_jobs(db_session) -> list[Job]:
-    jobs = db_session.query(JobORM).all()
-    return [orm_to_job(job) for job in jobs]
 
 
 def get_application_by_id(db_session, application_id) -> App:
@@ -112,56 +234,181 @@ def get_unscraped_applications(db_session) -> list[App]:
     return [orm_to_app(app) for app in apps]
 
 
-def get_unprepared_applications(db_session) -> list[App]:
-    """Fetch all unprepared apps."""
+def get_submitted_applications(db_session) -> list[App]:
+    """Fetch all submitted applications."""
     apps = (
-        db_session.query(ApplicationORM)
-        .filter(
-            (ApplicationORM.prepared == False) & (ApplicationORM.prepare_claim == False)
-        )
-        .all()
+        db_session.query(ApplicationORM).filter(ApplicationORM.submitted == True).all()
     )
     return [orm_to_app(app) for app in apps]
 
 
-def get_unapproved_applications(db_session) -> list[App]:
-    """Fetch all unapproved applications."""
-    apps = (
-        db_session.query(ApplicationORM)
-        .filter(
-            (ApplicationORM.prepared == True)
-            & (ApplicationORM.approved == False)
-            & (ApplicationORM.discarded == False)
-            & (ApplicationORM.submitted == False)
+def get_submitted_application_statuses(db_session) -> list[dict]:
+    """Fetch submitted applications with their job's company/title and current status.
+
+    Joins jobs and projects only the columns needed, so this is a single query
+    regardless of how many applications have been submitted.
+    """
+    rows = (
+        db_session.query(
+            ApplicationORM.id,
+            ApplicationORM.job_id,
+            JobORM.company,
+            JobORM.title,
+            ApplicationORM.referred,
+            ApplicationORM.submitted,
+            ApplicationORM.acknowledged,
+            ApplicationORM.assessment,
+            ApplicationORM.interview,
+            ApplicationORM.rejected,
         )
+        .join(JobORM, ApplicationORM.job_id == JobORM.id)
+        .filter(ApplicationORM.submitted == True)
         .all()
     )
-    return [orm_to_app(app) for app in apps]
+    return [
+        {
+            "app_id": str(row.id),
+            "job_id": str(row.job_id),
+            "company": row.company,
+            "title": row.title,
+            "referred": bool(row.referred),
+            "submitted": bool(row.submitted),
+            "acknowledged": bool(row.acknowledged),
+            "assessment": bool(row.assessment),
+            "interview": bool(row.interview),
+            "rejected": bool(row.rejected),
+        }
+        for row in rows
+    ]
 
 
-def get_approved_applications(db_session) -> list[App]:
-    """Fetch all user-approved applications."""
-    apps = (
-        db_session.query(ApplicationORM)
-        .filter(
-            (ApplicationORM.approved == True)
-            & (ApplicationORM.submitted == False)
-            & (ApplicationORM.submission_claim == False)
+def _embedded_approved_applications():
+    return (ApplicationORM.approved == True) & (ApplicationORM.field_embeddings != None)
+
+
+def get_answer_examples_version(db_session) -> tuple:
+    """Changes whenever an approved application's embedded answers change.
+
+    Keyed on embeddings_updated_at rather than updated_at, which also moves on
+    status changes that leave the examples as they are.
+    """
+    return tuple(
+        db_session.query(
+            func.count(ApplicationORM.id),
+            func.max(ApplicationORM.embeddings_updated_at),
         )
-        .all()
+        .filter(_embedded_approved_applications())
+        .one()
     )
-    return [orm_to_app(app) for app in apps]
 
 
-def get_submitted_applications(db_session) -> list[App]:
-    """Fetch all submitted applications."""
-    apps = (
-        db_session.query(ApplicationORM).filter(ApplicationORM.submitted == True).all()
+def get_answer_examples(
+    db_session, batch_size: int = 500
+) -> tuple[list[AppField], list[list[float]]]:
+    """Answered fields of approved applications and their question embeddings."""
+    examples, embeddings = [], []
+    rows = (
+        db_session.query(ApplicationORM.fields, ApplicationORM.field_embeddings)
+        .filter(_embedded_approved_applications())
+        .yield_per(batch_size)
     )
-    return [orm_to_app(app) for app in apps]
+    for fields, field_embeddings in rows:
+        for field, embedding in zip(fields or [], field_embeddings):
+            if embedding is not None and field.get("answer"):
+                examples.append(AppField(**field))
+                embeddings.append(embedding)
+    return examples, embeddings
+
+
+def get_approved_application_ids_without_embeddings(db_session) -> list[UUID]:
+    rows = (
+        db_session.query(ApplicationORM.id)
+        .filter(
+            ApplicationORM.approved == True,
+            ApplicationORM.field_embeddings == None,
+        )
+        .all()
+    )
+    return [row.id for row in rows]
 
 
 def get_all_applications(db_session) -> list[App]:
     """Fetch all applications."""
     apps = db_session.query(ApplicationORM).all()
     return [orm_to_app(app) for app in apps]
+
+
+def count_jobs_by_classification(db_session) -> dict[str, int]:
+    """Count jobs per review classification, with unreviewed jobs under "unreviewed"."""
+    classification = case(
+        (JobORM.reviewed == True, JobORM.review["classification"].as_string()),
+        else_=literal("unreviewed"),
+    )
+    rows = db_session.query(classification, func.count()).group_by(classification).all()
+    return {cls: count for cls, count in rows if cls}
+
+
+def count_jobs_by_host(db_session, *criteria) -> dict[str, int]:
+    """Count jobs per URL host, largest first. Extra criteria filter the jobs counted."""
+    host = func.coalesce(JobORM.host, "no URL")
+    rows = (
+        db_session.query(host, func.count())
+        .filter(*criteria)
+        .group_by(host)
+        .order_by(func.count().desc())
+        .all()
+    )
+    return {host: count for host, count in rows}
+
+
+def count_approved_jobs_without_app_by_host(db_session) -> dict[str, int]:
+    """Count reviewed, approved, undiscarded jobs that have no application, per URL host."""
+    return count_jobs_by_host(db_session, *_approved_without_app())
+
+
+def count_applications_by_state(db_session) -> dict[str, int]:
+    """Count applications in total and per state flag in a single scan."""
+    row = db_session.query(
+        func.count(),
+        func.count().filter(ApplicationORM.approved),
+        func.count().filter(ApplicationORM.discarded),
+        func.count().filter(ApplicationORM.submitted),
+        func.count().filter(ApplicationORM.acknowledged),
+        func.count().filter(ApplicationORM.rejected),
+    ).one()
+    return {
+        "total_apps": row[0],
+        "approved": row[1],
+        "discarded": row[2],
+        "submitted": row[3],
+        "acknowledged": row[4],
+        "rejected": row[5],
+    }
+
+
+def iter_jobs_json(db_session, since: datetime | None = None, batch_size: int = 1000):
+    """Stream jobs as JSON dicts in update order via a server-side cursor.
+
+    Only rows updated after since are included, for incremental pulls.
+    """
+    query = db_session.query(JobORM)
+    if since is not None:
+        query = query.filter(JobORM.updated_at > since)
+    for job in query.order_by(JobORM.updated_at, JobORM.id).yield_per(batch_size):
+        yield {**orm_to_job(job).to_json(), "updated_at": job.updated_at.isoformat()}
+
+
+def iter_applications_json(
+    db_session, since: datetime | None = None, batch_size: int = 1000
+):
+    """Stream applications as JSON dicts in update order via a server-side cursor.
+
+    Only rows updated after since are included, for incremental pulls.
+    """
+    query = db_session.query(ApplicationORM)
+    if since is not None:
+        query = query.filter(ApplicationORM.updated_at > since)
+    for app in query.order_by(ApplicationORM.updated_at, ApplicationORM.id).yield_per(
+        batch_size
+    ):
+        yield {**orm_to_app(app).to_json(), "updated_at": app.updated_at.isoformat()}
@@ -1,22 +1,29 @@
 import asyncio
+import json
 import logging
 import os
 import random
-from datetime import date
+from datetime import date, datetime, timezone
 from uuid import UUID
 
 import debugpy
 import uvicorn
-from core.jobs import get_domain_handler
+from core.answers import evict_answers
+from core.jobs import ASYNC_DOMAIN_HANDLERS, get_domain_handler
+from core.metrics import get_browser_stats, get_cache_stats, get_llm_usage
 from core.utils import clean_url, get_base_url
 from db.database import SessionLocal, get_db
-from db.models import ApplicationORM, JobORM
+from db.models import JobORM
 from db.utils.claims import (
+    REVIEW_BATCH_LEASE_SECONDS,
     claim_app_for_prep,
     claim_app_for_submission,
+    claim_ids,
     claim_job_for_app_creation,
     claim_job_for_expiration_check,
     claim_job_for_review,
+    claim_next,
+    reap_expired_claims,
 )
 from db.utils.mutations import (
     add_new_application,
@@ -30,35 +37,41 @@ from db.utils.mutations import (
     update_job_by_id,
 )
 from db.utils.queries import (
-    get_all_applications,
-    get_all_jobs,
+    count_applications_by_state,
+    count_approved_jobs_without_app_by_host,
+    count_jobs_by_classification,
+    count_jobs_by_host,
     get_application_by_id,
     get_application_by_job_id,
-    get_approved_applications,
+    get_approved_application_ids_without_embeddings,
+    get_approved_jobs_without_app,
     get_job_by_id,
-    get_reviewed_jobs,
-    get_submitted_applications,
-    get_unapproved_applications,
-    get_unapproved_jobs,
-    get_unexpired_jobs_older_than_one_week,
-    get_unprepared_applications,
-    get_unreviewed_jobs,
+    get_jobs_page,
+    get_submitted_application_statuses,
+    get_unapproved_applications_page,
+    get_unapproved_jobs_page,
+    iter_applications_json,
+    iter_jobs_json,
 )
 from fastapi import Body, Depends, FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, HttpUrl, model_validator
-from schemas.definitions import App, AppFragment, Job, Review, User
+from schemas.definitions import App, AppFragment, Job, Review, SearchProfile, User
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from worker.tasks import (
     check_if_job_still_exists_task,
     create_app_task,
+    create_apps_task,
+    embed_app_answers_task,
+    expiration_sweep_task,
     evaluate_job_task,
-    get_new_jobs_task,
     get_task_status,
     prepare_application_task,
+    schedule_job_searches,
     submit_application_task,
+    submit_review_batch_task,
 )
 
 # Configure logging
@@ -106,6 +119,19 @@ app.add_middleware(
 
 DEFAULT_JOBS_TO_FIND = 50
 
+# Max rows leased per bulk endpoint call
+CLAIM_BATCH_SIZE = int(os.environ.get("CLAIM_BATCH_SIZE", "500"))
+
+# Jobs per task for sites that are scraped concurrently in one event loop
+SCRAPE_BATCH_SIZE = int(os.environ.get("SCRAPE_BATCH_SIZE", "20"))
+
+# Batch API reviews finish within 24h; REVIEW_BATCH_LEASE_SECONDS outlives that window
+REVIEW_BATCH_SIZE = int(os.environ.get("REVIEW_BATCH_SIZE", "5000"))
+
+# Submissions are slow and human-paced; claim only what the workers can start
+# before the leases run out
+SUBMIT_BATCH_SIZE = int(os.environ.get("SUBMIT_BATCH_SIZE", "10"))
+
 # Limit concurrent background operations that might use DB connections
 MAX_CONCURRENT_TASKS = int(os.environ.get("MAX_CONCURRENT_TASKS", "8"))
 task_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
@@ -123,6 +149,16 @@ user = User(
     work_mode_ranking=["hybrid", "onsite", "remote"],
 )
 
+# Searches run by /jobs/find; JOB_SEARCH_PROFILES takes a JSON list of profiles
+search_profiles = [
+    SearchProfile(search_terms=["software engineer"], locations=["New York, NY"]),
+]
+if os.environ.get("JOB_SEARCH_PROFILES"):
+    search_profiles = [
+        SearchProfile(**profile)
+        for profile in json.loads(os.environ["JOB_SEARCH_PROFILES"])
+    ]
+
 
 @app.get("/task/{task_id}")
 def check_task(task_id: str):
@@ -157,16 +193,26 @@ def find_jobs(
     ),
 ):
     """Find and save current job listings"""
-    # task
-    task = get_new_jobs_task.delay(num_jobs)
+    # arg validation
+    # profiles can overlap; run each (site, term, location) search once
+    shards = list(
+        {
+            json.dumps(shard, sort_keys=True): shard
+            for profile in search_profiles
+            for shard in profile.shards()
+        }.values()
+    )
+
+    # send-off
+    task_ids = schedule_job_searches(shards, num_jobs)
 
     # response
     return JSONResponse(
         status_code=202,
         content={
-            "task_id": task.id,
+            "task_ids": task_ids,
             "status": "success",
-            "message": "Job search started in background",
+            "message": f"{len(task_ids)} job searches started in background",
         },
     )
 
@@ -196,14 +242,15 @@ def review_job(job_id: UUID):
                 },
             )
 
-        if not claim_job_for_review(db, job_id):
+        claim_token = claim_job_for_review(db, job_id)
+        if not claim_token:
             return JSONResponse(
                 status_code=202,
                 content={"message": f"Job {job_id} already queued for review"},
             )
 
     # task
-    task = evaluate_job_task.delay(job.id, user.to_json())
+    task = evaluate_job_task.delay(job.id, user.to_json(), claim_token)
 
     # response
     return JSONResponse(
@@ -270,14 +317,15 @@ def create_job_application(job_id: UUID):
                 },
             )
 
-        if not claim_job_for_app_creation(db, job_id):
+        claim_token = claim_job_for_app_creation(db, job_id)
+        if not claim_token:
             return JSONResponse(
                 status_code=202,
                 content={"message": f"Job {job_id} already queued for app creation"},
             )
 
     # task
-    task = create_app_task.delay(job_id)
+    task = create_app_task.delay(job_id, claim_token)
 
     # response
     return JSONResponse(
@@ -320,7 +368,8 @@ def expire_job(job_id: UUID):
                 },
             )
 
-        if not claim_job_for_expiration_check(db, job_id):
+        claim_token = claim_job_for_expiration_check(db, job_id)
+        if not claim_token:
             return JSONResponse(
                 status_code=202,
                 content={
@@ -329,7 +378,7 @@ def expire_job(job_id: UUID):
             )
 
     # logic
-    task = check_if_job_still_exists_task.delay(job_id)
+    task = check_if_job_still_exists_task.delay(job_id, claim_token)
 
     # response
     return JSONResponse(
@@ -385,14 +434,15 @@ def prepare_application(app_id: UUID):
                 },
             )
 
-        if not claim_app_for_prep(db, app_id):
+        claim_token = claim_app_for_prep(db, app_id)
+        if not claim_token:
             return JSONResponse(
                 status_code=202,
                 content={"message": f"App {app_id} already queued for preparation"},
             )
 
     # task
-    task = prepare_application_task.delay(job.id, app.id, user.to_json())
+    task = prepare_application_task.delay(job.id, app.id, user.to_json(), claim_token)
 
     # response
     return JSONResponse(
@@ -473,14 +523,15 @@ def submit_application(app_id: UUID):
                 },
             )
 
-        if not claim_app_for_submission(db, app_id):
+        claim_token = claim_app_for_submission(db, app_id)
+        if not claim_token:
             return JSONResponse(
                 status_code=202,
                 content={"message": f"App {app_id} already queued for preparation"},
             )
 
     # task
-    task = submit_application_task.delay(job.id, app_id)
+    task = submit_application_task.delay(job.id, app_id, claim_token)
 
     # response
     return JSONResponse(
@@ -495,17 +546,33 @@ def submit_application(app_id: UUID):
 
 # bulk endpoints
 @app.put("/jobs/review")
-def review_jobs(db: Session = Depends(get_db)):
-    """Review unreviewed jobs for candidate aptitude"""
+def review_jobs(batch: bool = Query(False), db: Session = Depends(get_db)):
+    """Review unreviewed jobs for candidate aptitude.
+
+    With batch=true the jobs are reviewed through the OpenAI Batch API, which
+    is cheaper but may take up to 24 hours to finish.
+    """
     # arg validation
-    jobs = get_unreviewed_jobs(db)
+    if batch:
+        jobs = claim_next(
+            db,
+            REVIEW_BATCH_SIZE,
+            "review",
+            lease_seconds=REVIEW_BATCH_LEASE_SECONDS,
+        )
+    else:
+        jobs = claim_next(db, CLAIM_BATCH_SIZE, "review")
     if len(jobs) == 0:
         return Response(status_code=204)
 
     # send-off
-    for job in jobs:
-        if claim_job_for_review(db, job.id):
-            evaluate_job_task.delay(job.id, user.to_json())
+    if batch:
+        submit_review_batch_task.delay(
+            [str(job.id) for job in jobs], user.to_json(), jobs[0].claimed_by
+        )
+    else:
+        for job in jobs:
+            evaluate_job_task.delay(job.id, user.to_json(), job.claimed_by)
 
     # response
     return JSONResponse(
@@ -516,16 +583,22 @@ def review_jobs(db: Session = Depends(get_db)):
 
 @app.put("/jobs/expire")
 def expire_jobs(db: Session = Depends(get_db)):
-    """Expire jobs that are past their expiration date"""
+    """Check jobs that are due for an expiration check"""
     # arg validation
-    jobs = get_unexpired_jobs_older_than_one_week(db)
+    now = datetime.now(timezone.utc)
+    jobs = claim_next(
+        db,
+        CLAIM_BATCH_SIZE,
+        "expiration_check",
+        JobORM.next_check_at <= now,
+        order_by=JobORM.next_check_at,
+    )
     if len(jobs) == 0:
         return Response(status_code=204)
 
     # send-off
-    for job in jobs:
-        if job.linkedin_job_url and claim_job_for_expiration_check(db, job.id):
-            check_if_job_still_exists_task.delay(job.id)
+    # one sweep per batch, so its per-host rate limit covers every request
+    expiration_sweep_task.delay([str(job.id) for job in jobs], jobs[0].claimed_by)
 
     # response
     return JSONResponse(
@@ -538,16 +611,25 @@ def expire_jobs(db: Session = Depends(get_db)):
 def create_job_applications(db: Session = Depends(get_db)):
     """Creates new application for unscraped apps."""
     # arg validation
-    jobs = get_reviewed_jobs(db)
+    jobs = get_approved_jobs_without_app(db)
     if len(jobs) == 0:
         return Response(status_code=204)
 
     # send-off
-    for job in jobs:
-        if job.approved:
-            job_url = job.direct_job_url or job.linkedin_job_url
-            if get_domain_handler(job_url) and claim_job_for_app_creation(db, job.id):
-                create_app_task.delay(job.id)
+    job_urls = {
+        job.id: job.direct_job_url or job.linkedin_job_url
+        for job in jobs
+        if get_domain_handler(job.direct_job_url or job.linkedin_job_url)
+    }
+    batch = []
+    claimed = claim_ids(db, "create_app", list(job_urls))
+    for job in claimed:
+        if get_base_url(job_urls[job.id]) in ASYNC_DOMAIN_HANDLERS:
+            batch.append(str(job.id))
+        else:
+            create_app_task.delay(job.id, job.claimed_by)
+    for i in range(0, len(batch), SCRAPE_BATCH_SIZE):
+        create_apps_task.delay(batch[i : i + SCRAPE_BATCH_SIZE], claimed[0].claimed_by)
 
     # response
     return JSONResponse(
@@ -560,14 +642,15 @@ def create_job_applications(db: Session = Depends(get_db)):
 def prepare_applications(db: Session = Depends(get_db)):
     """Prepares unprepared applications."""
     # arg validation
-    apps = get_unprepared_applications(db)
+    apps = claim_next(db, CLAIM_BATCH_SIZE, "prepare")
     if len(apps) == 0:
         return Response(status_code=204)
 
     # send-off
     for app in apps:
-        if claim_app_for_prep(db, app.id):
-            prepare_application_task.delay(app.job_id, app.id, user.to_json())
+        prepare_application_task.delay(
+            app.job_id, app.id, user.to_json(), app.claimed_by
+        )
 
     # response
     return JSONResponse(
@@ -580,14 +663,13 @@ def prepare_applications(db: Session = Depends(get_db)):
 def submit_applications(db: Session = Depends(get_db)):
     """Submits approved applications."""
     # arg validation
-    apps = get_approved_applications(db)
+    apps = claim_next(db, SUBMIT_BATCH_SIZE, "submission")
     if len(apps) == 0:
         return Response(status_code=204)
 
     # send off
     for app in apps:
-        if claim_app_for_submission(db, app.id):
-            submit_application_task.delay(app.job_id, app.id)
+        submit_application_task.delay(app.job_id, app.id, app.claimed_by)
 
     # response
     return JSONResponse(
@@ -596,34 +678,105 @@ def submit_applications(db: Session = Depends(get_db)):
     )
 
 
+@app.put("/apps/embed")
+def embed_approved_apps(db: Session = Depends(get_db)):
+    """Embed the answers of approved applications that aren't embedded yet"""
+    # arg validation
+    app_ids = get_approved_application_ids_without_embeddings(db)
+    if len(app_ids) == 0:
+        return Response(status_code=204)
+
+    # send-off
+    for app_id in app_ids:
+        embed_app_answers_task.delay(app_id)
+
+    # response
+    return JSONResponse(
+        status_code=202,
+        content={"status": "success", "message": "Answer embedding started"},
+    )
+
+
+@app.put("/claims/reap")
+def reap_claims(db: Session = Depends(get_db)):
+    """Release claims whose lease expired so their rows re-enter the queues."""
+    reaped = reap_expired_claims(db)
+    return JSONResponse(
+        status_code=200,
+        content={"status": "success", "reaped": reaped},
+    )
+
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+
 @app.get("/jobs")
-def list_all_jobs(db: Session = Depends(get_db)):
+def list_all_jobs(
+    cursor: str | None = Query(None, description="Cursor from a previous page"),
+    limit: int | None = Query(None, ge=1, le=500, description="Page size (1-500)"),
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    db: Session = Depends(get_db),
+):
     """List all saved job applications."""
-    jobs = get_all_jobs(db)
+    try:
+        jobs, next_cursor = get_jobs_page(
+            db, cursor=cursor, limit=limit, fields=_parse_fields(fields)
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400, content={"status": "error", "message": str(e)}
+        )
     return JSONResponse(
         status_code=200,
-        content={"jobs": [job.to_json() for job in jobs]},
+        content={"jobs": jobs, "next_cursor": next_cursor},
     )
 
 
 # frontend endpoints
 @app.get("/jobs/unapproved")
-def list_all_jobs(db: Session = Depends(get_db)):
+def list_unapproved_jobs(
+    cursor: str | None = Query(None, description="Cursor from a previous page"),
+    limit: int | None = Query(None, ge=1, le=500, description="Page size (1-500)"),
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    db: Session = Depends(get_db),
+):
     """List all unapproved job applications (for frontend page)."""
-    jobs = get_unapproved_jobs(db)
+    try:
+        jobs, next_cursor = get_unapproved_jobs_page(
+            db, cursor=cursor, limit=limit, fields=_parse_fields(fields)
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400, content={"status": "error", "message": str(e)}
+        )
     return JSONResponse(
         status_code=200,
-        content={"jobs": [job.to_json() for job in jobs]},
+        content={"jobs": jobs, "next_cursor": next_cursor},
     )
 
 
 @app.get("/apps/unapproved")
-def get_unapproved_apps(db: Session = Depends(get_db)):
+def get_unapproved_apps(
+    cursor: str | None = Query(None, description="Cursor from a previous page"),
+    limit: int | None = Query(None, ge=1, le=500, description="Page size (1-500)"),
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    db: Session = Depends(get_db),
+):
     """Gets all applications that still need to be approved by the user."""
-    apps = get_unapproved_applications(db)
+    try:
+        apps, next_cursor = get_unapproved_applications_page(
+            db, cursor=cursor, limit=limit, fields=_parse_fields(fields)
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400, content={"status": "error", "message": str(e)}
+        )
     return JSONResponse(
         status_code=200,
-        content={"apps": [app.to_json() for app in apps]},
+        content={"apps": apps, "next_cursor": next_cursor},
     )
 
 
@@ -631,25 +784,7 @@ def get_unapproved_apps(db: Session = Depends(get_db)):
 def get_applied_apps(db: Session = Depends(get_db)):
     """List submitted (applied) applications with their job company/title and current status."""
     try:
-        apps = get_submitted_applications(db)
-        result = []
-        for app in apps:
-            job = get_job_by_id(db, app.job_id)
-            result.append(
-                {
-                    "app_id": str(app.id),
-                    "job_id": str(app.job_id),
-                    "company": job.company,
-                    "title": job.title,
-                    "referred": bool(app.referred),
-                    "submitted": bool(app.submitted),
-                    "acknowledged": bool(app.acknowledged),
-                    "assessment": bool(app.assessment),
-                    "interview": bool(app.interview),
-                    "rejected": bool(app.rejected),
-                }
-            )
-
+        result = get_submitted_application_statuses(db)
         return JSONResponse(status_code=200, content={"apps": result})
     except Exception as e:
         logging.error("/apps/applied: error listing applied apps", exc_info=True)
@@ -729,6 +864,8 @@ def update_application_from_fragment(
             )
 
         update_application_by_id_with_fragment(db, app_id, app_data)
+        if app.approved:
+            embed_app_answers_task.delay(app_id)
 
         return JSONResponse(
             status_code=200,
@@ -979,6 +1116,7 @@ def approve_application(app_id: UUID, db: Session = Depends(get_db)):
             )
 
         approve_application_by_id(db, app.id)
+        embed_app_answers_task.delay(app.id)
 
         return JSONResponse(
             status_code=200,
@@ -1077,8 +1215,6 @@ def update_application_state(
 def get_jobs_summary(db: Session = Depends(get_db)):
     """Get the status of job reviews"""
     try:
-        jobs = get_all_jobs(db)
-        total_jobs = len(jobs)
         classification_counts = {
             "safety": 0,
             "target": 0,
@@ -1086,31 +1222,14 @@ def get_jobs_summary(db: Session = Depends(get_db)):
             "dream": 0,
             "unreviewed": 0,
         }
-        base_url_counts = {}
-
-        for job in jobs:
-            classification = job.review.classification if job.reviewed else "unreviewed"
-            if classification:
-                classification_counts[classification] += 1
-
-            if job.direct_job_url:
-                base_url = get_base_url(job.direct_job_url)
-                base_url_counts[base_url] = base_url_counts.get(base_url, 0) + 1
-            elif job.linkedin_job_url:
-                base_url = get_base_url(job.linkedin_job_url)
-                base_url_counts[base_url] = base_url_counts.get(base_url, 0) + 1
-            else:
-                base_url_counts["no URL"] = base_url_counts.get("no URL", 0) + 1
-
-        base_url_counts = dict(
-            sorted(base_url_counts.items(), key=lambda x: x[1], reverse=True)
-        )
+        classification_counts.update(count_jobs_by_classification(db))
+        base_url_counts = count_jobs_by_host(db)
 
         return JSONResponse(
             status_code=200,
             content={
                 "data": {
-                    "total_jobs": total_jobs,
+                    "total_jobs": sum(base_url_counts.values()),
                     "classifications": classification_counts,
                     "base_urls": base_url_counts,
                 },
@@ -1126,45 +1245,15 @@ def get_jobs_summary(db: Session = Depends(get_db)):
 def get_applications_summary(db: Session = Depends(get_db)):
     """Get the status of applications, plus metrics for approved jobs without a scraped application."""
     try:
-        apps = get_all_applications(db)
-        summary = {
-            "total_apps": len(apps),
-            "approved": sum(app.approved for app in apps),
-            "discarded": sum(app.discarded for app in apps),
-            "submitted": sum(app.submitted for app in apps),
-            "acknowledged": sum(app.acknowledged for app in apps),
-            "rejected": sum(app.rejected for app in apps),
-        }
+        summary = count_applications_by_state(db)
 
-        # Jobs that are reviewed, approved, not discarded, and have no app or unscraped app
-        approved_wo_app_query = (
-            db.query(JobORM.id)
-            .outerjoin(ApplicationORM, ApplicationORM.job_id == JobORM.id)
-            .filter(JobORM.reviewed, JobORM.approved, ~JobORM.discarded)
-            .filter(ApplicationORM.id == None)
-            .distinct()
-        )
-        approved_wo_app_job_ids = [row[0] for row in approved_wo_app_query.all()]
+        # Jobs that are reviewed, approved, not discarded, and have no app
+        base_urls = count_approved_jobs_without_app_by_host(db)
         summary["approved_without_app"] = {
-            "count": len(approved_wo_app_job_ids),
-            "base_urls": {},
+            "count": sum(base_urls.values()),
+            "base_urls": base_urls,
         }
 
-        if approved_wo_app_job_ids:
-            url_rows = (
-                db.query(JobORM.direct_job_url, JobORM.linkedin_job_url)
-                .filter(JobORM.id.in_(approved_wo_app_job_ids))
-                .all()
-            )
-            base_urls = {}
-            for direct_url, linkedin_url in url_rows:
-                url = direct_url or linkedin_url or "no URL"
-                base = get_base_url(url)
-                base_urls[base] = base_urls.get(base, 0) + 1
-            summary["approved_without_app"]["base_urls"] = dict(
-                sorted(base_urls.items(), key=lambda x: x[1], reverse=True)
-            )
-
         return JSONResponse(status_code=200, content={"data": summary})
     except Exception as e:
         return JSONResponse(
@@ -1172,5 +1261,89 @@ def get_applications_summary(db: Session = Depends(get_db)):
         )
 
 
+@app.get("/llm/usage")
+def get_llm_usage_summary():
+    """Get token usage and prompt cache hit rate per LLM call site"""
+    try:
+        return JSONResponse(status_code=200, content={"data": get_llm_usage()})
+    except Exception as e:
+        return JSONResponse(
+            status_code=500, content={"status": "error", "message": str(e)}
+        )
+
+
+@app.get("/browser/stats")
+def get_browser_stats_summary():
+    """Get browser request, byte and page load totals per domain, and pool start counts"""
+    try:
+        return JSONResponse(status_code=200, content={"data": get_browser_stats()})
+    except Exception as e:
+        return JSONResponse(
+            status_code=500, content={"status": "error", "message": str(e)}
+        )
+
+
+@app.get("/answers/cache")
+def get_answer_cache_stats():
+    """Get answer cache hit/miss totals"""
+    try:
+        return JSONResponse(
+            status_code=200, content={"data": get_cache_stats("answers")}
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=500, content={"status": "error", "message": str(e)}
+        )
+
+
+@app.put("/answers/cache/evict")
+def evict_answer_cache():
+    """Evict expired and least recently used cached answers"""
+    try:
+        evicted = evict_answers()
+        return JSONResponse(
+            status_code=200, content={"status": "success", "evicted": evicted}
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=500, content={"status": "error", "message": str(e)}
+        )
+
+
+# export endpoints
+@app.get("/export/jobs.ndjson")
+def export_jobs(
+    since: datetime | None = Query(
+        None, description="Only export jobs updated after this timestamp"
+    ),
+):
+    """Stream every job as newline-delimited JSON."""
+
+    # the session lives inside the generator so it stays open while streaming
+    def stream():
+        with SessionLocal() as db:
+            for job in iter_jobs_json(db, since):
+                yield json.dumps(job) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get("/export/apps.ndjson")
+def export_applications(
+    since: datetime | None = Query(
+        None, description="Only export applications updated after this timestamp"
+    ),
+):
+    """Stream every application as newline-delimited JSON."""
+
+    # the session lives inside the generator so it stays open while streaming
+    def stream():
+        with SessionLocal() as db:
+            for app in iter_applications_json(db, since):
+                yield json.dumps(app) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -73,6 +73,29 @@ class Job(BaseModel):
         return f"{self.id},{self.jobspy_id},{self.title},{self.company},{self.location},{self.min_salary},{self.max_salary},{self.date_posted},{self.job_type},{self.linkedin_job_url},{self.direct_job_url}"
 
 
+class SearchProfile(BaseModel):
+    """Job searches to run: every term in every location on every site."""
+
+    search_terms: list[str]
+    locations: list[str]
+    sites: list[str] = field(default_factory=lambda: ["linkedin"])
+    hours_old: int = 24
+
+    def shards(self) -> list[dict]:
+        """One search per (site, term, location), as save_jobs keyword arguments."""
+        return [
+            {
+                "site": site,
+                "search_term": term,
+                "location": location,
+                "hours_old": self.hours_old,
+            }
+            for site in self.sites
+            for term in self.search_terms
+            for location in self.locations
+        ]
+
+
 class AppField(BaseModel):
     question: str
     multiple_choice: bool
@@ -120,7 +143,7 @@ class User(BaseModel):
             "email": self.email,
             "first name": self.first_name,
             "github": self.github_url,
-            "last_name": self.last_name,
+            "last name": self.last_name,
             "linkedin": self.linkedin_url,
             "location": self.current_location,
             "located": self.current_location,
@@ -0,0 +1,392 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+from playwright.sync_api import Browser, BrowserContext, Error, sync_playwright
+
+# Relaunch a browser after it has served this many contexts, to cap memory growth
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+
+# Requests scrapers never need: these resource types, and hosts outside the allowlist
+BROWSER_BLOCK_REQUESTS = os.getenv("BROWSER_BLOCK_REQUESTS", "1") == "1"
+BLOCKED_RESOURCE_TYPES = frozenset(
+    os.getenv("BLOCKED_RESOURCE_TYPES", "image,font,media").split(",")
+)
+ALLOWED_HOSTS = tuple(
+    os.getenv(
+        "BROWSER_ALLOWED_HOSTS", "ashbyhq.com,ashbyprd.com,linkedin.com,licdn.com"
+    ).split(",")
+)
+
+# page domain -> request and load time totals, per process
+_traffic: dict[str, dict] = {}
+_traffic_lock = threading.Lock()
+
+
+def _record_traffic(domain: str, **counts):
+    with _traffic_lock:
+        totals = _traffic.setdefault(
+            domain,
+            {
+                "blocked": 0,
+                "loaded": 0,
+                "bytes_loaded": 0,
+                "page_loads": 0,
+                "load_ms": 0,
+            },
+        )
+        for name, count in counts.items():
+            totals[name] += count
+
+
+def take_traffic_stats() -> dict[str, dict]:
+    """Request, byte and load time counts per domain since the last call, reset after.
+
+    Counts are per process; core.metrics.record_browser_stats adds them to the
+    shared totals.
+    """
+    global _traffic
+    with _traffic_lock:
+        stats, _traffic = _traffic, {}
+    return stats
+
+
+class RequestFilter:
+    """Aborts requests for blocked resource types or hosts outside the allowlist.
+
+    allowed_hosts=None allows every host (only resource types are filtered).
+    Blocked and loaded requests, bytes loaded (encoded body size, so chunked
+    and compressed responses count too) and page load times are tallied per page domain; compare runs with
+    BROWSER_BLOCK_REQUESTS off to see the bytes saved.
+    """
+
+    def __init__(
+        self,
+        blocked_types=BLOCKED_RESOURCE_TYPES,
+        allowed_hosts: tuple[str, ...] | None = ALLOWED_HOSTS,
+    ):
+        self.blocked_types = blocked_types
+        self.allowed_hosts = allowed_hosts
+        # page -> (domain, navigation start)
+        self._navigations = {}
+
+    def _host_allowed(self, host: str) -> bool:
+        if self.allowed_hosts is None or not host:  # data:, blob:
+            return True
+        return any(host == h or host.endswith(f".{h}") for h in self.allowed_hosts)
+
+    def _page_domain(self, request) -> str:
+        try:
+            page = request.frame.page
+        except Error:
+            return urlparse(request.url).netloc
+        if page in self._navigations:
+            return self._navigations[page][0]
+        return urlparse(page.url).netloc or urlparse(request.url).netloc
+
+    def _check(self, request) -> bool:
+        """Whether to let the request through, noting main-frame navigations."""
+        try:
+            frame = request.frame
+            main_navigation = (
+                request.is_navigation_request() and frame.parent_frame is None
+            )
+        except Error:  # e.g. service worker requests have no frame
+            main_navigation = False
+        if main_navigation:
+            domain = urlparse(request.url).netloc
+            self._navigations[frame.page] = (domain, time.monotonic())
+            return True
+
+        if request.resource_type in self.blocked_types or not self._host_allowed(
+            urlparse(request.url).hostname or ""
+        ):
+            _record_traffic(self._page_domain(request), blocked=1)
+            return False
+        return True
+
+    def _record_loaded(self, request, sizes: dict | None):
+        _record_traffic(
+            self._page_domain(request),
+            loaded=1,
+            bytes_loaded=max((sizes or {}).get("responseBodySize", 0), 0),
+        )
+
+    def _on_request_finished(self, request):
+        try:
+            sizes = request.sizes()
+        except Error:
+            sizes = None
+        self._record_loaded(request, sizes)
+
+    async def _on_request_finished_async(self, request):
+        try:
+            sizes = await request.sizes()
+        except Error:
+            sizes = None
+        self._record_loaded(request, sizes)
+
+    def _on_page(self, page):
+        def on_load():
+            navigation = self._navigations.get(page)
+            if navigation:
+                domain, started = navigation
+                elapsed_ms = int((time.monotonic() - started) * 1000)
+                _record_traffic(domain, page_loads=1, load_ms=elapsed_ms)
+
+        page.on("load", on_load)
+
+    def install(self, context):
+        def route(route):
+            if self._check(route.request):
+                route.continue_()
+            else:
+                route.abort()
+
+        context.route("**/*", route)
+        context.on("requestfinished", self._on_request_finished)
+        context.on("page", self._on_page)
+
+    async def install_async(self, context):
+        async def route(route):
+            if self._check(route.request):
+                await route.continue_()
+            else:
+                await route.abort()
+
+        await context.route("**/*", route)
+        context.on("requestfinished", self._on_request_finished_async)
+        context.on("page", self._on_page)
+
+
+def default_request_filter() -> RequestFilter | None:
+    return RequestFilter() if BROWSER_BLOCK_REQUESTS else None
+
+
+# context(request_filter=...) default, resolved to default_request_filter()
+_DEFAULT_FILTER = object()
+
+
+class BrowserPool:
+    """A long-lived browser that hands out isolated contexts.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    thread of each process gets its own pool via get_browser_pool.
+    """
+
+    def __init__(
+        self,
+        browser_type: str = "firefox",
+        headless: bool = True,
+        max_pages: int = BROWSER_MAX_PAGES,
+    ):
+        self.browser_type = browser_type
+        self.headless = headless
+        self.max_pages = max_pages
+        self.stats = {"cold_starts": 0, "warm_starts": 0, "recycles": 0}
+        self._playwright = None
+        self._browser: Browser | None = None
+        self._pages = 0
+
+    def _healthy(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    def _launch(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        launcher = getattr(self._playwright, self.browser_type)
+        self._browser = launcher.launch(headless=self.headless)
+        self._pages = 0
+
+    def _close_browser(self):
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Error:
+                pass
+        self._browser = None
+
+    def _acquire(self) -> Browser:
+        if self._healthy() and self._pages < self.max_pages:
+            self.stats["warm_starts"] += 1
+            return self._browser
+
+        if self._browser is not None:
+            if self._healthy():
+                self.stats["recycles"] += 1
+            else:
+                logging.warning(f"{self.browser_type} disconnected; relaunching")
+            self._close_browser()
+        self._launch()
+        self.stats["cold_starts"] += 1
+        return self._browser
+
+    @contextmanager
+    def context(self, request_filter=_DEFAULT_FILTER, **kwargs) -> BrowserContext:
+        """Borrow a fresh context (own cookies and storage); closed on exit.
+
+        request_filter defaults to default_request_filter(); pass None to load
+        everything. kwargs are passed to Browser.new_context, e.g. storage_state.
+        """
+        if request_filter is _DEFAULT_FILTER:
+            request_filter = default_request_filter()
+
+        browser = self._acquire()
+        try:
+            context = browser.new_context(**kwargs)
+        except Error:
+            # the browser died between the health check and now; retry once
+            self._close_browser()
+            browser = self._acquire()
+            context = browser.new_context(**kwargs)
+        if request_filter is not None:
+            request_filter.install(context)
+
+        self._pages += 1
+        try:
+            yield context
+        finally:
+            try:
+                context.close()
+            except Error:
+                pass
+            logging.debug(f"{self.browser_type} pool stats: {self.stats}")
+
+    def close(self):
+        self._close_browser()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+class AsyncBrowserPool:
+    """One browser shared by concurrent scrapes in an event loop.
+
+    Use as `async with AsyncBrowserPool() as pool`; each borrowed context is
+    isolated and closed on exit, and the browser is closed with the pool.
+    """
+
+    def __init__(self, browser_type: str = "firefox", headless: bool = True):
+        self.browser_type = browser_type
+        self.headless = headless
+        self.stats = {"cold_starts": 0, "warm_starts": 0}
+        self._playwright = None
+        self._browser = None
+        self._launch_lock = asyncio.Lock()
+
+    async def _acquire(self):
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                self.stats["warm_starts"] += 1
+                return self._browser
+
+            if self._browser is not None:
+                logging.warning(f"{self.browser_type} disconnected; relaunching")
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            launcher = getattr(self._playwright, self.browser_type)
+            self._browser = await launcher.launch(headless=self.headless)
+            self.stats["cold_starts"] += 1
+            return self._browser
+
+    @asynccontextmanager
+    async def context(self, request_filter=_DEFAULT_FILTER, **kwargs):
+        """Borrow a fresh context (own cookies and storage); closed on exit.
+
+        request_filter works as in BrowserPool.context.
+        """
+        if request_filter is _DEFAULT_FILTER:
+            request_filter = default_request_filter()
+
+        browser = await self._acquire()
+        context = await browser.new_context(**kwargs)
+        if request_filter is not None:
+            await request_filter.install_async(context)
+        try:
+            yield context
+        finally:
+            try:
+                await context.close()
+            except Error:
+                pass
+
+    async def close(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Error:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        logging.debug(f"{self.browser_type} async pool stats: {self.stats}")
+        with _async_pool_stats_lock:
+            totals = _async_pool_stats.setdefault(
+                f"{self.browser_type}_async", dict.fromkeys(self.stats, 0)
+            )
+            for name, count in self.stats.items():
+                totals[name] += count
+        self.stats = dict.fromkeys(self.stats, 0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+# (pid, thread id, browser type, headless) -> pool
+_pools: dict[tuple, BrowserPool] = {}
+
+# "<browser type>_async" -> counts of closed async pools, per process
+_async_pool_stats: dict[str, dict] = {}
+_async_pool_stats_lock = threading.Lock()
+
+
+def get_browser_pool(
+    browser_type: str = "firefox", headless: bool = True
+) -> BrowserPool:
+    """The calling thread's pool for a browser type."""
+    key = (os.getpid(), threading.get_ident(), browser_type, headless)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = BrowserPool(browser_type, headless)
+        _pools[key] = pool
+    return pool
+
+
+def take_browser_pool_stats() -> dict[str, dict]:
+    """Start and recycle counts of this process's pools since the last call, reset after."""
+    stats = {}
+    for (pid, _, browser_type, _), pool in list(_pools.items()):
+        if pid != os.getpid():
+            continue
+        counts, pool.stats = pool.stats, dict.fromkeys(pool.stats, 0)
+        totals = stats.setdefault(browser_type, dict.fromkeys(counts, 0))
+        for name, count in counts.items():
+            totals[name] += count
+
+    global _async_pool_stats
+    with _async_pool_stats_lock:
+        async_stats, _async_pool_stats = _async_pool_stats, {}
+    stats.update(async_stats)
+    return stats
+
+
+@atexit.register
+def _close_pools():
+    for (pid, thread_id, _, _), pool in list(_pools.items()):
+        # pools inherited from a parent process or owned by other threads can't be
+        # closed from here; the OS reclaims them
+        if pid == os.getpid() and thread_id == threading.get_ident():
+            try:
+                pool.close()
+            except Exception:
+                pass
@@ -1,3 +1,4 @@
+import asyncio
 import random
 import time
 from abc import ABC, abstractmethod
@@ -12,6 +13,11 @@ def human_delay(min_sec=0.5, max_sec=1.5, override=False):
         time.sleep(random.uniform(min_sec, max_sec))
 
 
+async def async_human_delay(min_sec=0.5, max_sec=1.5, override=False):
+    if EMULATE_HUMAN or override:
+        await asyncio.sleep(random.uniform(min_sec, max_sec))
+
+
 class JobSite(ABC):
     job: Job
 
@@ -27,3 +33,20 @@ class JobSite(ABC):
     def apply(self, app: App) -> bool:
         """Submit an application."""
         pass
+
+
+class AsyncJobSite(ABC):
+    """JobSite for asyncio scrapers, so many forms can load in one event loop.
+
+    Scraping only; applications are submitted through the sync JobSite.
+    """
+
+    job: Job
+
+    def __init__(self, job):
+        self.job = job
+
+    @abstractmethod
+    async def scrape_questions(self) -> App:
+        """Get the questions from a job application."""
+        pass
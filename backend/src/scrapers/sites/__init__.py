@@ -1,2 +1,2 @@
-from .ashby import Ashby
+from .ashby import Ashby, AsyncAshby
 from .linkedin import LinkedIn
@@ -1,11 +1,42 @@
+import asyncio
 import logging
+import os
+from urllib.parse import urlparse
 
+import requests
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
-from scrapers.scraper import EMULATE_HUMAN, JobSite, human_delay
+from scrapers.browser import AsyncBrowserPool, RequestFilter, get_browser_pool
+from scrapers.scraper import AsyncJobSite, JobSite, human_delay
 
 from schemas.definitions import App, AppField, Job
 
+# "http" reads the form definition from Ashby's posting API and falls back to
+# rendering the page; "browser" always renders the page
+ASHBY_SCRAPE_MODE = os.getenv("ASHBY_SCRAPE_MODE", "http")
+
+# The endpoint the hosted application page itself loads the form from
+ASHBY_POSTING_API_URL = "https://jobs.ashbyhq.com/api/non-user-graphql?op=ApiJobPosting"
+ASHBY_POSTING_QUERY = """query ApiJobPosting($organizationHostedJobsPageName: String!, $jobPostingId: String!) {
+  jobPosting(organizationHostedJobsPageName: $organizationHostedJobsPageName, jobPostingId: $jobPostingId) {
+    id
+    applicationForm {
+      sections {
+        fieldEntries {
+          ... on FormFieldEntry {
+            field
+          }
+        }
+      }
+    }
+  }
+}"""
+
+
+def question_text(text: str | None) -> str:
+    """Normalize a question title so the API, HTML parser and apply() agree."""
+    text = " ".join((text or "").split())
+    return text.removesuffix("*").rstrip()
+
 
 class Ashby(JobSite):
     job: Job
@@ -18,7 +49,7 @@ class Ashby(JobSite):
         answer_area = divs[0]
         if len(divs) > 1 and "ashby-application-form-question-description" in divs[
             0
-        ].get("class"):
+        ].get("class", []):
             answer_area = divs[1]
         return answer_area
 
@@ -101,14 +132,92 @@ class Ashby(JobSite):
 
         assert value.split(",")[0] in (cb.input_value())
 
+    def _new_app(self) -> App:
+        return App(
+            job_id=self.job.id,
+            url=(
+                self.job.direct_job_url
+                if self.job.direct_job_url
+                else (self.job.linkedin_job_url if self.job.linkedin_job_url else None)
+            ),
+        )
+
     def scrape_questions(self) -> App:
+        if ASHBY_SCRAPE_MODE == "http":
+            try:
+                return self.scrape_questions_http()
+            except Exception as e:
+                logging.warning(
+                    f"Ashby posting API failed for job {self.job.id}; rendering the page instead: {e}"
+                )
+        return self.scrape_questions_browser()
+
+    def scrape_questions_http(self, timeout: float = 15) -> App:
+        """Build the App from the posting API's form definition, without a browser."""
+        path = urlparse(self.job.direct_job_url).path.strip("/").split("/")
+        if len(path) < 2:
+            raise ValueError(f"Not an Ashby posting URL: {self.job.direct_job_url}")
+
+        response = requests.post(
+            ASHBY_POSTING_API_URL,
+            json={
+                "operationName": "ApiJobPosting",
+                "variables": {
+                    "organizationHostedJobsPageName": path[0],
+                    "jobPostingId": path[1],
+                },
+                "query": ASHBY_POSTING_QUERY,
+            },
+            timeout=timeout,
+        )
+        response.raise_for_status()
+
+        posting = (response.json().get("data") or {}).get("jobPosting")
+        if not posting or not posting.get("applicationForm"):
+            raise ValueError(f"No application form for job {self.job.id}")
+        return self.parse_form_definition(posting["applicationForm"])
+
+    def parse_form_definition(self, form: dict) -> App:
+        """Build an App from the posting API's applicationForm, matching the HTML parser."""
+        app = self._new_app()
+        for section in form.get("sections") or []:
+            for entry in section.get("fieldEntries") or []:
+                field = entry.get("field") or {}
+                question = question_text(field.get("title"))
+                if not question:
+                    continue
+
+                field_type = field.get("type")
+                if field_type == "Boolean":  # yes/no question
+                    choices = ["Yes", "No"]
+                elif field_type in ("ValueSelect", "MultiValueSelect"):
+                    choices = [
+                        value.get("label")
+                        for value in field.get("selectableValues") or []
+                    ]
+                else:  # text, email, phone, location, file upload, ...
+                    choices = None
+
+                app.fields.append(
+                    AppField(
+                        question=question,
+                        multiple_choice=choices is not None,
+                        choices=choices,
+                        answer=None,
+                    )
+                )
+
+        if not app.fields:
+            raise ValueError(f"Application form for job {self.job.id} has no fields")
+        return app
+
+    def scrape_questions_browser(self) -> App:
         url = self.job.direct_job_url
         if not url.endswith("/application"):
             url += "/application"
 
-        with sync_playwright() as p:
-            browser = p.firefox.launch(headless=True)
-            page = browser.new_page()
+        with get_browser_pool("firefox").context() as context:
+            page = context.new_page()
             page.goto(url)
             page.wait_for_selector(
                 "div.ashby-application-form-container"
@@ -116,97 +225,85 @@ class Ashby(JobSite):
 
             # get page content
             html = page.content()
-            soup = BeautifulSoup(html, "html.parser")
-            browser.close()  # we have all the info we need at this point
-
-            # parse job app
-            app = App(
-                job_id=self.job.id,
-                url=(
-                    self.job.direct_job_url
-                    if self.job.direct_job_url
-                    else (
-                        self.job.linkedin_job_url if self.job.linkedin_job_url else None
-                    )
-                ),
-            )
-            form = soup.find(class_="ashby-application-form-container")
-            sections = form.find_all(class_="ashby-application-form-section-container")
-            for section in sections:
-                for element in section:
-                    question = element.find(
-                        class_="ashby-application-form-question-title"
-                    )
-                    if (
-                        element.name != "fieldset" and question is None
-                    ):  # skip non questions
-                        continue
 
-                    if "ashby-application-form-field-entry" in element.get(
-                        "class"
-                    ):  # scrape text question
-                        children = element.find_all(recursive=False)
-                        answer_area = self.find_answer_area(children)
-                        if (
-                            answer_area.name == "input"
-                            or answer_area.name == "textarea"
-                        ):  # label + input/textarea = text answer
+        return self.parse_questions(html)
+
+    def parse_questions(self, html: str) -> App:
+        """Build an App from the rendered application form's HTML."""
+        soup = BeautifulSoup(html, "html.parser")
+
+        # parse job app
+        app = self._new_app()
+        form = soup.find(class_="ashby-application-form-container")
+        sections = form.find_all(class_="ashby-application-form-section-container")
+        for section in sections:
+            for element in section.find_all(recursive=False):
+                question = element.find(class_="ashby-application-form-question-title")
+                if (
+                    element.name != "fieldset" and question is None
+                ):  # skip non questions
+                    continue
+                question = question_text(question.text if question else None)
+
+                if "ashby-application-form-field-entry" in element.get(
+                    "class", []
+                ):  # scrape text question
+                    children = element.find_all(recursive=False)
+                    answer_area = self.find_answer_area(children)
+                    if (
+                        answer_area.name == "input" or answer_area.name == "textarea"
+                    ):  # label + input/textarea = text answer
+                        app.fields.append(
+                            AppField(
+                                question=question,
+                                multiple_choice=False,
+                                choices=None,
+                                answer=None,
+                            )
+                        )
+                    elif (
+                        answer_area.name == "div"
+                    ):  # label + div = yes/no or text dropdown or file upload
+                        if "_yesno_hkyf8_143" in answer_area.get(
+                            "class", []
+                        ):  # yes/no question
                             app.fields.append(
                                 AppField(
-                                    question=question.text,
-                                    multiple_choice=False,
-                                    choices=None,
+                                    question=question,
+                                    multiple_choice=True,
+                                    choices=["Yes", "No"],
                                     answer=None,
                                 )
                             )
-                        elif (
-                            answer_area.name == "div"
-                        ):  # label + div = yes/no or text dropdown or file upload
-                            if "_yesno_hkyf8_143" in answer_area.get(
-                                "class"
-                            ):  # yes/no question
-                                app.fields.append(
-                                    AppField(
-                                        question=question.text,
-                                        multiple_choice=True,
-                                        choices=["Yes", "No"],
-                                        answer=None,
-                                    )
-                                )
-                            else:  # text dropdown or file upload
-                                app.fields.append(
-                                    AppField(
-                                        question=question.text,
-                                        multiple_choice=False,
-                                        choices=None,
-                                        answer=None,
-                                    )
+                        else:  # text dropdown or file upload
+                            app.fields.append(
+                                AppField(
+                                    question=question,
+                                    multiple_choice=False,
+                                    choices=None,
+                                    answer=None,
                                 )
-                    elif element.name == "fieldset":  # scrape multiple choice question
-                        choices = []
-
-                        checkboxes = element.find_all("input", {"type": "checkbox"})
-                        if len(checkboxes) > 0:
-                            for checkbox in checkboxes:
-                                choice = checkbox.get("name")
-                                choices.append(choice)
-
-                        radio_buttons = element.find_all("input", {"type": "radio"})
-                        radio_answers = element.find_all(
-                            "label", class_="_label_1v5e2_43"
-                        )
-                        if len(radio_buttons) > 0:
-                            for choice in radio_answers:
-                                choices.append(choice.text)
-
-                        app.fields.append(
-                            AppField(
-                                question=question.text,
-                                multiple_choice=True,
-                                choices=choices,
-                                answer=None,
                             )
+                elif element.name == "fieldset":  # scrape multiple choice question
+                    choices = []
+
+                    # apply() clicks options by their label text, so both
+                    # checkboxes and radio buttons are listed by label
+                    for option in element.find_all(class_="_option_1v5e2_35"):
+                        label = option.find("label", class_="_label_1v5e2_43")
+                        if label is not None:
+                            choices.append(question_text(label.text))
+                        elif option.find("input") is not None:
+                            choices.append(option.find("input").get("name"))
+
+                    app.fields.append(
+                        AppField(
+                            question=question,
+                            multiple_choice=True,
+                            choices=choices,
+                            answer=None,
                         )
+                    )
 
         return app
 
@@ -216,9 +313,11 @@ class Ashby(JobSite):
             url += "/application"
 
         try:
-            with sync_playwright() as p:
-                browser = p.firefox.launch(headless=True)
-                page = browser.new_page()
+            # only drop heavy resources; submission may need third-party scripts
+            with get_browser_pool("firefox").context(
+                request_filter=RequestFilter(allowed_hosts=None)
+            ) as context:
+                page = context.new_page()
                 page.goto(url, wait_until="domcontentloaded")
                 page.wait_for_selector("div.ashby-application-form-container")
 
@@ -228,16 +327,13 @@ class Ashby(JobSite):
 
                 total = question_elements.count()
                 for i in range(total):
-                    if i >= len(app.fields):
-                        break
-
                     element = question_elements.nth(i)
                     tag = element.evaluate("e => e.tagName.toLowerCase()")
 
-                    question = element.locator(
-                        ".ashby-application-form-question-title"
-                    ).first.text_content()
-                    answer = app.find_answer(question)
+                    title = element.locator(".ashby-application-form-question-title")
+                    if title.count() == 0:  # skip non questions
+                        continue
+                    answer = app.find_answer(question_text(title.first.text_content()))
 
                     if tag == "div":
                         text_input = element.locator("._input_hkyf8_33").first
@@ -276,7 +372,7 @@ class Ashby(JobSite):
                         count_cb = checkboxes.count()
                         for j in range(count_cb):
                             option = checkboxes.nth(j)
-                            if (option.text_content()) == answer:
+                            if question_text(option.text_content()) == answer:
                                 option.scroll_into_view_if_needed()
                                 option.locator("input").first.click()
                                 human_delay()
@@ -327,3 +423,34 @@ class Ashby(JobSite):
         except Exception as e:
             logging.error(f"Error occurred while submitting app {app.id}: {e}")
             raise e
+
+
+class AsyncAshby(AsyncJobSite):
+    job: Job
+
+    def __init__(self, job, pool: AsyncBrowserPool):
+        self.job = job
+        self.pool = pool
+
+    async def scrape_questions(self) -> App:
+        if ASHBY_SCRAPE_MODE == "http":
+            try:
+                return await asyncio.to_thread(Ashby(self.job).scrape_questions_http)
+            except Exception as e:
+                logging.warning(
+                    f"Ashby posting API failed for job {self.job.id}; rendering the page instead: {e}"
+                )
+
+        url = self.job.direct_job_url
+        if not url.endswith("/application"):
+            url += "/application"
+
+        async with self.pool.context() as context:
+            page = await context.new_page()
+            await page.goto(url)
+            await page.wait_for_selector(
+                "div.ashby-application-form-container"
+            )  # wait until loaded
+            html = await page.content()
+
+        return Ashby(self.job).parse_questions(html)
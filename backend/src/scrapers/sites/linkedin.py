@@ -1,13 +1,17 @@
 import asyncio
 import logging
 import os
+import re
+import threading
 import uuid
 from pathlib import Path
 
+import httpx
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from scrapers.browser import get_browser_pool
 from scrapers.scraper import JobSite, human_delay
 
 from schemas.definitions import App, AppField, Job, Review
@@ -27,6 +31,144 @@ _STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 _STORAGE_PATH = _STORAGE_DIR / "linkedin.json"
 
 
+# Expiration checks share one keep-alive connection pool per process
+EXPIRATION_CONNECT_TIMEOUT = float(os.getenv("EXPIRATION_CONNECT_TIMEOUT", "5"))
+EXPIRATION_READ_TIMEOUT = float(os.getenv("EXPIRATION_READ_TIMEOUT", "15"))
+EXPIRATION_POOL_SIZE = int(os.getenv("EXPIRATION_POOL_SIZE", "16"))
+
+# Closed postings render an element with this class; matched as a whole token of a
+# class attribute (either quote style), so inline CSS and longer class names don't count
+CLOSED_MARKER = re.compile(
+    rb"""(?<![\w-])class\s*=\s*(?:"(?:[^"]*\s)?closed-job__flavor--closed[\s"]"""
+    rb"""|'(?:[^']*\s)?closed-job__flavor--closed[\s'])"""
+)
+_MARKER_OVERLAP = 1024
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """This process's pooled session for LinkedIn page requests."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=EXPIRATION_POOL_SIZE,
+                    max_retries=Retry(
+                        total=2,
+                        backoff_factor=0.5,
+                        status_forcelist=(429, 500, 502, 503, 504),
+                        allowed_methods=("GET",),
+                    ),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+class ClosedMarkerScanner:
+    """Incrementally looks for the closed-posting marker in a byte stream."""
+
+    def __init__(self):
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> bool:
+        """True once the marker has been seen; callers can stop reading then."""
+        window = self._tail + chunk
+        if CLOSED_MARKER.search(window):
+            return True
+        # keep enough of the end to catch a marker split across chunks
+        self._tail = window[-_MARKER_OVERLAP:]
+        return False
+
+
+def scan_for_closed_marker(chunks) -> bool:
+    """Whether the closed-posting marker appears in a stream of byte chunks.
+
+    Stops reading at the first match.
+    """
+    scanner = ClosedMarkerScanner()
+    return any(scanner.feed(chunk) for chunk in chunks)
+
+
+def _conditional_headers(etag: str | None, last_modified: str | None) -> dict:
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def fetch_expiration(
+    url: str, etag: str | None = None, last_modified: str | None = None
+) -> tuple[bool | None, str | None, str | None]:
+    """Check whether a LinkedIn posting is closed, revalidating when possible.
+
+    Returns (expired, etag, last_modified). expired is None when the server
+    answered 304 Not Modified, i.e. the page is unchanged since the validators
+    were issued.
+    """
+    with get_http_session().get(
+        url,
+        headers=_conditional_headers(etag, last_modified),
+        timeout=(EXPIRATION_CONNECT_TIMEOUT, EXPIRATION_READ_TIMEOUT),
+        stream=True,
+    ) as response:
+        if response.status_code == 304:
+            return None, etag, last_modified
+        response.raise_for_status()
+        expired = scan_for_closed_marker(response.iter_content(chunk_size=16384))
+        return (
+            expired,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """A pooled async client for LinkedIn page requests; use as a context manager."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            EXPIRATION_READ_TIMEOUT, connect=EXPIRATION_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(max_connections=EXPIRATION_POOL_SIZE),
+        transport=httpx.AsyncHTTPTransport(retries=2),
+        follow_redirects=True,
+    )
+
+
+async def fetch_expiration_async(
+    client: httpx.AsyncClient,
+    url: str,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> tuple[bool | None, str | None, str | None]:
+    """fetch_expiration over an async client; same return values."""
+    async with client.stream(
+        "GET", url, headers=_conditional_headers(etag, last_modified)
+    ) as response:
+        if response.status_code == 304:
+            return None, etag, last_modified
+        response.raise_for_status()
+        scanner = ClosedMarkerScanner()
+        expired = False
+        async for chunk in response.aiter_bytes(chunk_size=16384):
+            if scanner.feed(chunk):
+                expired = True
+                break
+        return (
+            expired,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
+
 class LinkedInCheckpointError(Exception):
     """Raised when LinkedIn presents a checkpoint (e.g., CAPTCHA/verification)."""
 
@@ -177,12 +319,10 @@ class LinkedIn(JobSite):
                 url=self.job.linkedin_job_url,
             )
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=self.headless)
-                # Use a browser context so we can persist and restore auth state
-                context = browser.new_context(
-                    storage_state=str(_STORAGE_PATH) if _STORAGE_PATH.exists() else None
-                )
+            # Borrow an isolated context so we can persist and restore auth state
+            with get_browser_pool("chromium", self.headless).context(
+                storage_state=str(_STORAGE_PATH) if _STORAGE_PATH.exists() else None
+            ) as context:
                 context.set_default_timeout(60000)  # 60s
                 page = context.new_page()
 
@@ -273,7 +413,6 @@ class LinkedIn(JobSite):
                         self._find_questions(app, page, submit=submit)
                         if not submit:
                             # caller only wants questions; stop before submitting
-                            browser.close()
                             app.scraped = True
                             return app
                         self.__next_page(button)
@@ -320,12 +459,8 @@ class LinkedIn(JobSite):
         return True
 
     def check_for_expiration(self) -> bool:
-        html = requests.get(self.job.linkedin_job_url).text
-        soup = BeautifulSoup(html, "html.parser")
-        if soup.find(class_="closed-job__flavor--closed"):
-            return True
-        else:
-            return False
+        expired, _, _ = fetch_expiration(self.job.linkedin_job_url)
+        return expired
 
 
 if __name__ == "__main__":
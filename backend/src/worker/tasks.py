@@ -1,34 +1,61 @@
 import logging
 import os
 import random
+import time
 from json import JSONDecodeError
 from uuid import UUID
 
-import redis
 from celery import Celery
+from celery.signals import task_postrun
 from core.jobs import (
     check_job_expiration,
+    check_job_expirations,
     prepare_job_app,
     save_jobs,
     scrape_job_app,
+    scrape_job_apps,
     submit_app,
 )
-from core.llm import evaluate_candidate_aptitude
+from core.embeddings import AnswerIndex, embed_questions
+from core.llm import (
+    evaluate_candidate_aptitude,
+    get_review_batch_results,
+    submit_review_batch,
+)
+from core.metrics import record_browser_stats
 from core.utils import get_base_url
+from db.cache import redis_client
 from db.database import SessionLocal
 from db.utils.claims import (
+    REVIEW_BATCH_LEASE_SECONDS,
     clear_app_preparation_claim,
     clear_app_submission_claim,
     clear_job_app_creation_claim,
     clear_job_expiration_claim,
     clear_job_review_claim,
+    renew_claims,
+    set_app_prepared,
+    set_app_submitted,
     set_job_app_created,
     set_job_expired,
     set_job_reviewed,
+    set_jobs_expiration_checked,
+)
+from db.utils.mutations import (
+    add_new_scraped_jobs,
+    request_expiration_check,
+    set_app_field_embeddings,
 )
-from db.utils.mutations import add_new_scraped_jobs
-from db.utils.queries import get_application_by_id, get_job_by_id
+from db.utils.queries import (
+    get_answer_examples,
+    get_answer_examples_version,
+    get_application_by_id,
+    get_job_by_id,
+    get_jobs_by_ids,
+)
+from openai import NotFoundError
 from requests import JSONDecodeError
+from scrapers.browser import take_browser_pool_stats, take_traffic_stats
 from schemas.definitions import App, Job, User
 from schemas.errors import MissingAppUrlError, QuestionNotFoundError
 
@@ -42,17 +69,87 @@ celery_app.conf.update(
     worker_concurrency=int(os.getenv("CELERY_CONCURRENCY", "4")),
 )
 
+REVIEW_BATCH_POLL_SECONDS = int(os.getenv("REVIEW_BATCH_POLL_SECONDS", "300"))
+# Consecutive failed polls before a batch is abandoned and its claims released
+REVIEW_BATCH_MAX_POLL_ERRORS = int(os.getenv("REVIEW_BATCH_MAX_POLL_ERRORS", "5"))
+
+# Searches of one site start at least this far apart, across all workers;
+# override per site with e.g. JOBSPY_SEARCH_INTERVAL_SECONDS_INDEED
+JOBSPY_SEARCH_INTERVAL_SECONDS = int(os.getenv("JOBSPY_SEARCH_INTERVAL_SECONDS", "60"))
+# site -> unix time its next search may start
+JOBSPY_NEXT_SLOT_KEY = "jobspy:next_slot:{site}"
+
+# (version, index) of approved answers, rebuilt when approved apps change
+_answer_index: tuple[tuple, AnswerIndex] | None = None
+
+
+def _acquire_jobspy_lock(site: str, ttl_seconds: int = 60):
+    return redis_client.lock(
+        f"jobspy:lock:{site}", timeout=ttl_seconds, blocking_timeout=0
+    )
+
 
-def _get_redis_client():
-    url = os.getenv("CELERY_BACKEND_URL") or os.getenv("CELERY_BROKER_URL")
-    return (
-        redis.from_url(url) if url else redis.Redis(host="localhost", port=6379, db=0)
+def _search_interval(site: str) -> int:
+    return int(
+        os.getenv(
+            f"JOBSPY_SEARCH_INTERVAL_SECONDS_{site.upper()}",
+            JOBSPY_SEARCH_INTERVAL_SECONDS,
+        )
     )
 
 
-def _acquire_jobspy_lock(ttl_seconds: int = 60):
-    client = _get_redis_client()
-    return client.lock("jobspy:lock", timeout=ttl_seconds, blocking_timeout=0)
+def _reserve_search_slot(client, site: str) -> float:
+    """Take the site's next free search slot; returns seconds until it starts."""
+    key = JOBSPY_NEXT_SLOT_KEY.format(site=site)
+    interval = _search_interval(site)
+
+    def reserve(pipe):
+        now = time.time()
+        slot = max(now, float(pipe.get(key) or 0))
+        pipe.multi()
+        pipe.set(key, slot + interval, ex=int(slot + interval - now) + 1)
+        return slot - now
+
+    return client.transaction(reserve, key, value_from_callable=True)
+
+
+def _get_answer_index() -> AnswerIndex:
+    global _answer_index
+    with SessionLocal() as db:
+        version = get_answer_examples_version(db)
+        if _answer_index is None or _answer_index[0] != version:
+            _answer_index = (version, AnswerIndex(*get_answer_examples(db)))
+    return _answer_index[1]
+
+
+def _still_claimed(
+    stage: str, ids: list, claim_token: str | None, **kwargs
+) -> set[str]:
+    """Renew this task's claims; the ids it may still process.
+
+    Without a token (e.g. a task queued before tokens existed) every id is
+    returned and the stage's own done checks apply.
+    """
+    if claim_token is None:
+        return {str(row_id) for row_id in ids}
+    with SessionLocal() as db:
+        renewed = renew_claims(db, stage, ids, claim_token, **kwargs)
+    return {str(row_id) for row_id in renewed}
+
+
+@task_postrun.connect
+def publish_browser_stats(task=None, **kwargs):
+    """Log the browser traffic a task generated and add it to the shared totals."""
+    traffic = take_traffic_stats()
+    pools = {
+        name: counts
+        for name, counts in take_browser_pool_stats().items()
+        if any(counts.values())
+    }
+    if not traffic and not pools:
+        return
+    logging.info(f"{task.name} browser stats: traffic={traffic} pools={pools}")
+    record_browser_stats(traffic, pools)
 
 
 def validate_job_id(job_id: UUID) -> Job:
@@ -97,52 +194,73 @@ def get_task_status(task_id: str):
         }
 
 
+def schedule_job_searches(shards: list[dict], num_jobs: int) -> list[str]:
+    """Queue one get_new_jobs_task per search, spaced out per site.
+
+    Each search takes its site's next free slot, so searches of different
+    sites run in parallel while each site sees at most one per interval.
+    """
+    task_ids = []
+    for shard in shards:
+        delay = _reserve_search_slot(redis_client, shard["site"])
+        task = get_new_jobs_task.apply_async((num_jobs, shard), countdown=delay)
+        task_ids.append(task.id)
+    return task_ids
+
+
 @celery_app.task(
-    rate_limit="1/m",
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_backoff_max=60,
     retry_jitter=True,
     retry_kwargs={"max_retries": 5},
 )
-def get_new_jobs_task(num_jobs: int):
+def get_new_jobs_task(num_jobs: int, shard: dict | None = None):
+    shard = shard or {}
+    site = shard.get("site", "linkedin")
+
     # logic
     try:
-        lock = _acquire_jobspy_lock(ttl_seconds=45)
+        lock = _acquire_jobspy_lock(
+            site, ttl_seconds=celery_app.conf.task_soft_time_limit
+        )
         if not lock.acquire(blocking=False):
             raise get_new_jobs_task.retry(
-                exc=RuntimeError("JobSpy is busy; retrying later"),
+                exc=RuntimeError(f"JobSpy is busy on {site}; retrying later"),
                 countdown=random.randint(5, 20),
             )
         try:
-            logging.info("Finding jobs...")
-            jobs = save_jobs(num_jobs)
+            logging.info(f"Finding jobs: {shard or 'default search'}")
+            jobs = save_jobs(num_jobs, **shard)
         finally:
             try:
                 lock.release()
             except Exception:
                 pass
     except Exception as e:
-        raise Exception(f"Error saving jobs", e)
+        raise Exception("Error saving jobs", e)
 
     # database operation
+    # shards overlap; the bulk ingest skips listings another shard already stored
     try:
         with SessionLocal() as db:
             jobs = add_new_scraped_jobs(db, jobs)
     except Exception as e:
-        raise Exception(f"Error adding new jobs to database", e)
+        raise Exception("Error adding new jobs to database", e)
 
     return len(jobs)
 
 
 @celery_app.task
-def evaluate_job_task(job_id: UUID, user: dict) -> bool:
+def evaluate_job_task(job_id: UUID, user: dict, claim_token: str | None = None) -> bool:
     user = User(**user)
     job = validate_job_id(job_id)
+    if not _still_claimed("review", [job.id], claim_token):
+        return False
 
     if job.reviewed:
         with SessionLocal() as db:
-            clear_job_review_claim(db, job.id)
+            clear_job_review_claim(db, job.id, claim_token=claim_token)
         return True
 
     # logic
@@ -157,24 +275,138 @@ def evaluate_job_task(job_id: UUID, user: dict) -> bool:
             error_message = f"Error reviewing job {job.id}"
 
         with SessionLocal() as db:
-            clear_job_review_claim(db, job.id)
+            clear_job_review_claim(db, job.id, claim_token=claim_token)
 
         raise Exception(error_message, e)
 
     # database operation
     try:
         with SessionLocal() as db:
-            set_job_reviewed(db, job.id, review)
+            set_job_reviewed(db, job.id, review, claim_token=claim_token)
         return True
     except Exception as e:
         with SessionLocal() as db:
-            clear_job_review_claim(db, job.id)
+            clear_job_review_claim(db, job.id, claim_token=claim_token)
         raise Exception(f"Error updating job {job.id} in database", e)
 
 
+def _clear_review_claims(job_ids: list[str], claim_token: str | None = None):
+    with SessionLocal() as db:
+        for job_id in job_ids:
+            clear_job_review_claim(db, job_id, claim_token=claim_token)
+
+
+@celery_app.task
+def submit_review_batch_task(
+    job_ids: list[str], user: dict, claim_token: str | None = None
+) -> str:
+    user = User(**user)
+    job_ids = list(
+        _still_claimed(
+            "review",
+            job_ids,
+            claim_token,
+            lease_seconds=REVIEW_BATCH_LEASE_SECONDS,
+        )
+    )
+    with SessionLocal() as db:
+        jobs = [job for job in get_jobs_by_ids(db, job_ids) if not job.reviewed]
+
+    # release claims on jobs that were reviewed or removed since being claimed
+    found = {str(job.id) for job in jobs}
+    _clear_review_claims(
+        [job_id for job_id in job_ids if job_id not in found], claim_token
+    )
+    if not jobs:
+        return None
+
+    # logic
+    try:
+        logging.info(f"Submitting review batch for {len(jobs)} jobs...")
+        batch_id = submit_review_batch(jobs, user)
+    except Exception as e:
+        _clear_review_claims(list(found), claim_token)
+        raise Exception("Error submitting review batch", e)
+
+    poll_review_batch_task.apply_async(
+        (batch_id, list(found), claim_token, time.time()),
+        countdown=REVIEW_BATCH_POLL_SECONDS,
+    )
+    return batch_id
+
+
+@celery_app.task
+def poll_review_batch_task(
+    batch_id: str,
+    job_ids: list[str],
+    claim_token: str | None = None,
+    submitted_at: float | None = None,
+    errors: int = 0,
+) -> int | None:
+    """Check on a review batch, rescheduling itself until the batch finishes.
+
+    Gives up and releases the batch's claims when the batch is unknown, after
+    REVIEW_BATCH_MAX_POLL_ERRORS consecutive failed polls, or once it has run
+    longer than its claims' lease.
+    """
+    if submitted_at is None:  # queued before submission times were passed along
+        submitted_at = time.time()
+
+    def poll_again(errors: int = 0):
+        poll_review_batch_task.apply_async(
+            (batch_id, job_ids, claim_token, submitted_at, errors),
+            countdown=REVIEW_BATCH_POLL_SECONDS,
+        )
+
+    # logic
+    try:
+        status, reviews = get_review_batch_results(batch_id)
+    except Exception as e:
+        errors += 1
+        if isinstance(e, NotFoundError) or errors >= REVIEW_BATCH_MAX_POLL_ERRORS:
+            _clear_review_claims(job_ids, claim_token)
+            raise Exception(
+                f"Gave up on review batch {batch_id} after {errors} failed polls; claims released",
+                e,
+            )
+        poll_again(errors)
+        raise Exception(f"Error polling review batch {batch_id}", e)
+
+    if reviews is None:
+        if time.time() - submitted_at > REVIEW_BATCH_LEASE_SECONDS:
+            logging.error(
+                f"Review batch {batch_id} still {status} past its lease; claims released"
+            )
+            _clear_review_claims(job_ids, claim_token)
+            return None
+        logging.info(f"Review batch {batch_id} is {status}; checking again later")
+        poll_again()
+        return None
+
+    # database operation
+    with SessionLocal() as db:
+        for job_id in job_ids:
+            review = reviews.get(job_id)
+            try:
+                if review is None:
+                    clear_job_review_claim(db, job_id, claim_token=claim_token)
+                else:
+                    set_job_reviewed(db, job_id, review, claim_token=claim_token)
+            except Exception:
+                db.rollback()
+                logging.exception(f"Error updating job {job_id} from review batch")
+
+    logging.info(
+        f"Review batch {batch_id} {status}: {len(reviews)}/{len(job_ids)} jobs reviewed"
+    )
+    return len(reviews)
+
+
 @celery_app.task
-def create_app_task(job_id: UUID) -> UUID:
+def create_app_task(job_id: UUID, claim_token: str | None = None) -> UUID:
     job = validate_job_id(job_id)
+    if not _still_claimed("create_app", [job.id], claim_token):
+        return False
 
     # logic
     try:
@@ -190,86 +422,221 @@ def create_app_task(job_id: UUID) -> UUID:
             error_message = f"Error scraping job {job.id}"
 
         with SessionLocal() as db:
-            clear_job_app_creation_claim(db, job.id)
+            clear_job_app_creation_claim(db, job.id, claim_token=claim_token)
 
         raise Exception(error_message, e)
 
     # database operation
     try:
         with SessionLocal() as db:
-            set_job_app_created(db, app)
+            set_job_app_created(db, app, claim_token=claim_token)
     except Exception as e:
-        clear_job_app_creation_claim(db, job.id)
+        with SessionLocal() as db:
+            clear_job_app_creation_claim(db, job.id, claim_token=claim_token)
         raise Exception(f"Error updating app {app.id} in database", e)
 
     return app.scraped
 
 
 @celery_app.task
-def check_if_job_still_exists_task(job_id: UUID):
+def create_apps_task(job_ids: list[str], claim_token: str | None = None) -> int:
+    job_ids = list(_still_claimed("create_app", job_ids, claim_token))
+    with SessionLocal() as db:
+        jobs = get_jobs_by_ids(db, job_ids)
+
+    # release claims on jobs removed since being claimed
+    found = {str(job.id) for job in jobs}
+    with SessionLocal() as db:
+        for job_id in job_ids:
+            if job_id not in found:
+                clear_job_app_creation_claim(db, job_id, claim_token=claim_token)
+
+    # logic
+    logging.info(f"Scraping {len(jobs)} job apps...")
+    try:
+        results = scrape_job_apps(jobs)
+    except Exception as e:
+        with SessionLocal() as db:
+            for job in jobs:
+                clear_job_app_creation_claim(db, job.id, claim_token=claim_token)
+        raise Exception(f"Error scraping {len(jobs)} job apps", e)
+
+    # database operation
+    scraped = 0
+    with SessionLocal() as db:
+        for job, result in zip(jobs, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                set_job_app_created(db, result, claim_token=claim_token)
+                scraped += 1
+            except Exception as e:
+                logging.error(f"Error creating app for job {job.id}: {e}")
+                clear_job_app_creation_claim(db, job.id, claim_token=claim_token)
+
+    return scraped
+
+
+@celery_app.task
+def check_if_job_still_exists_task(job_id: UUID, claim_token: str | None = None):
     job = validate_job_id(job_id)
+    if not _still_claimed("expiration_check", [job.id], claim_token):
+        return False
 
     if job.expired:
         with SessionLocal() as db:
-            clear_job_expiration_claim(db, job.id)
+            clear_job_expiration_claim(db, job.id, claim_token=claim_token)
         return True
 
     # logic
     try:
         expired = check_job_expiration(job)
     except Exception as e:
-        clear_job_expiration_claim(db, job.id)
+        with SessionLocal() as db:
+            clear_job_expiration_claim(db, job.id, claim_token=claim_token)
         raise Exception(f"Error checking job expiration for {job.id}", e)
 
     # database operation
     try:
         with SessionLocal() as db:
             if expired:
-                set_job_expired(db, job.id)
+                set_job_expired(db, job.id, claim_token=claim_token)
             else:
-                clear_job_expiration_claim(db, job.id)
+                clear_job_expiration_claim(db, job.id, claim_token=claim_token)
     except Exception as e:
-        clear_job_expiration_claim(db, job.id)
+        with SessionLocal() as db:
+            clear_job_expiration_claim(db, job.id, claim_token=claim_token)
         raise Exception(f"Error updating job {job.id} in database", e)
 
     return expired
 
 
 @celery_app.task
-def prepare_application_task(job_id: UUID, app_id: UUID, user: dict):
+def expiration_sweep_task(job_ids: list[str], claim_token: str | None = None) -> dict:
+    job_ids = list(_still_claimed("expiration_check", job_ids, claim_token))
+    with SessionLocal() as db:
+        jobs = get_jobs_by_ids(db, job_ids)
+
+    # logic
+    started = time.monotonic()
+    try:
+        results = check_job_expirations(jobs)
+    except Exception as e:
+        with SessionLocal() as db:
+            set_jobs_expiration_checked(db, job_ids, claim_token=claim_token)
+        raise Exception(f"Error checking expiration of {len(jobs)} jobs", e)
+    elapsed = time.monotonic() - started
+
+    expired_ids, unchanged_ids, changed_ids = [], [], []
+    errors = 0
+    for job, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            logging.error(f"Error checking job expiration for {job.id}: {result}")
+            errors += 1
+        elif result is None:
+            unchanged_ids.append(job.id)
+        elif result:
+            expired_ids.append(job.id)
+        else:
+            changed_ids.append(job.id)
+
+    # database operation
+    # also releases claims on jobs that errored or were removed since being claimed
+    try:
+        with SessionLocal() as db:
+            set_jobs_expiration_checked(
+                db,
+                job_ids,
+                expired_ids,
+                unchanged_ids,
+                changed_ids,
+                claim_token=claim_token,
+            )
+    except Exception as e:
+        with SessionLocal() as db:
+            set_jobs_expiration_checked(db, job_ids, claim_token=claim_token)
+        raise Exception(f"Error updating {len(job_ids)} jobs in database", e)
+
+    throughput = {
+        "checked": len(jobs) - errors,
+        "expired": len(expired_ids),
+        "changed": len(changed_ids),
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "jobs_per_second": round(len(jobs) / elapsed, 2) if elapsed else 0,
+    }
+    logging.info(f"Expiration sweep: {throughput}")
+    return throughput
+
+
+@celery_app.task
+def prepare_application_task(
+    job_id: UUID, app_id: UUID, user: dict, claim_token: str | None = None
+):
     job = validate_job_id(job_id)
     app = validate_app_id(app_id)
     user = User(**user)
+    if not _still_claimed("prepare", [app.id], claim_token):
+        return False
 
     if app.prepared:
         with SessionLocal() as db:
-            clear_app_preparation_claim(db, job.id)
+            clear_app_preparation_claim(db, app.id, claim_token=claim_token)
         return True
 
     # logic
     try:
         logging.info(f"Preparing app {app.id}...")
-        prepared_app = prepare_job_app(job, app, user)
+        prepared_app = prepare_job_app(job, app, user, answer_index=_get_answer_index())
     except Exception as e:
-        clear_app_preparation_claim(db, job.id)
+        with SessionLocal() as db:
+            clear_app_preparation_claim(db, app.id, claim_token=claim_token)
         raise Exception(f"Failed to prepare app {app.id}", e)
 
     # database operation
     try:
         with SessionLocal() as db:
-            # TODO: handle atomic update
-            pass
+            set_app_prepared(db, app.id, prepared_app, claim_token=claim_token)
+    except Exception as e:
+        with SessionLocal() as db:
+            clear_app_preparation_claim(db, app.id, claim_token=claim_token)
+        raise Exception(f"Error updating app {app.id} in database", e)
+
+    return True
+
+
+@celery_app.task
+def embed_app_answers_task(app_id: UUID) -> int:
+    app = validate_app_id(app_id)
+
+    # logic
+    answered = [i for i, field in enumerate(app.fields) if field.answer]
+    try:
+        vectors = embed_questions([app.fields[i].question for i in answered])
+    except Exception as e:
+        raise Exception(f"Error embedding answers for app {app.id}", e)
+
+    embeddings = [None] * len(app.fields)
+    for i, vector in zip(answered, vectors):
+        embeddings[i] = vector.tolist()
+
+    # database operation
+    try:
+        with SessionLocal() as db:
+            set_app_field_embeddings(db, app.id, embeddings)
     except Exception as e:
-        clear_app_preparation_claim(db, job.id)
         raise Exception(f"Error updating app {app.id} in database", e)
 
-    return prepared_app.prepared
+    return len(answered)
 
 
 @celery_app.task
-def submit_application_task(job_id: UUID, app_id: UUID):
+def submit_application_task(job_id: UUID, app_id: UUID, claim_token: str | None = None):
     job = validate_job_id(job_id)
     app = validate_app_id(app_id)
+    # a resubmission would send the same application twice
+    if app.submitted or not _still_claimed("submission", [app.id], claim_token):
+        return False
 
     # logic
     try:
@@ -286,6 +653,9 @@ def submit_application_task(job_id: UUID, app_id: UUID):
             error_message = f"Job {job.id} is missing URLs"
         elif type(e) is QuestionNotFoundError:
             error_message = f"Required question not found for app {app.id}"
+            # the form changed under us; the posting may have closed
+            with SessionLocal() as db:
+                request_expiration_check(db, job.id)
         elif type(e) is NotImplementedError:
             error_message = (
                 f"{get_base_url(app.url)} app submission is not supported at this time"
@@ -294,17 +664,20 @@ def submit_application_task(job_id: UUID, app_id: UUID):
             error_message = f"Error submitting application for app {app.id}"
 
         with SessionLocal() as db:
-            clear_app_submission_claim(db, app.id)
+            clear_app_submission_claim(db, app.id, claim_token=claim_token)
 
         raise Exception(error_message, e)
 
     # database operation
     try:
         with SessionLocal() as db:
-            # TODO: handle atomic update
-            pass
+            if applied_app.submitted:
+                set_app_submitted(db, app.id, claim_token=claim_token)
+            else:
+                clear_app_submission_claim(db, app.id, claim_token=claim_token)
     except Exception as e:
-        clear_app_submission_claim(db, app.id)
+        with SessionLocal() as db:
+            clear_app_submission_claim(db, app.id, claim_token=claim_token)
         raise Exception(f"Error updating app {app.id} in database", e)
 
     return applied_app.submitted
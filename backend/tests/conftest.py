@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+# core.llm builds its OpenAI client at import; tests stub every call it makes
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+# Database tests need a real Postgres; point this at a scratch database, the schema is dropped afterwards
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def pg_engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from db.models import Base
+    from sqlalchemy import create_engine
+
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
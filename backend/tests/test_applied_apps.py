@@ -0,0 +1,67 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from db.models import ApplicationORM, JobORM
+from db.utils.queries import get_submitted_application_statuses
+
+SUBMITTED_APPS = 10_000
+
+
+@pytest.fixture
+def session(pg_engine):
+    job_ids = [uuid.uuid4() for _ in range(SUBMITTED_APPS + 100)]
+    with Session(pg_engine) as db_session:
+        db_session.execute(
+            insert(JobORM),
+            [
+                {
+                    "id": job_id,
+                    "jobspy_id": f"li-{i}",
+                    "title": f"Engineer {i}",
+                    "company": f"Company {i % 50}",
+                    "description": "x" * 4000,
+                }
+                for i, job_id in enumerate(job_ids)
+            ],
+        )
+        db_session.execute(
+            insert(ApplicationORM),
+            [
+                {
+                    "job_id": job_id,
+                    "url": f"https://jobs.ashbyhq.com/example/{i}",
+                    # the last 100 are not submitted yet
+                    "submitted": i < SUBMITTED_APPS,
+                    "interview": i % 10 == 0,
+                }
+                for i, job_id in enumerate(job_ids)
+            ],
+        )
+        db_session.commit()
+        yield db_session
+
+
+def test_submitted_statuses_use_one_query(session):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        start = time.perf_counter()
+        statuses = get_submitted_application_statuses(session)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    print(f"{len(statuses)} submitted apps in {elapsed * 1000:.0f} ms")
+    assert len(statements) == 1
+    assert len(statuses) == SUBMITTED_APPS
+    assert sum(status["interview"] for status in statuses) == SUBMITTED_APPS // 10
+    assert {"company", "title"} <= statuses[0].keys()
@@ -0,0 +1,43 @@
+import os
+import time
+
+import pytest
+from scrapers.sites.ashby import Ashby
+
+from schemas.definitions import Job
+
+# Live benchmark of the posting API against the rendered page; needs network and
+# Playwright's Firefox. Space-separated jobs.ashbyhq.com posting URLs, run with -s
+ASHBY_BENCH_URLS = os.environ.get("ASHBY_BENCH_URLS", "").split()
+
+pytestmark = pytest.mark.skipif(
+    not ASHBY_BENCH_URLS, reason="ASHBY_BENCH_URLS is not set"
+)
+
+
+def timed(scrape) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    app = scrape()
+    return (time.perf_counter() - start) * 1000, [f.question for f in app.fields]
+
+
+def test_api_vs_browser_ms_per_job():
+    api_ms, browser_ms = [], []
+    for url in ASHBY_BENCH_URLS:
+        ashby = Ashby(
+            Job(jobspy_id=url, title="", company="", direct_job_url=url.rstrip("/"))
+        )
+        api_time, from_api = timed(ashby.scrape_questions_http)
+        browser_time, from_browser = timed(ashby.scrape_questions_browser)
+        api_ms.append(api_time)
+        browser_ms.append(browser_time)
+        print(f"{url}: api {api_time:.0f} ms, browser {browser_time:.0f} ms")
+
+        # the API may list conditional questions the page hides
+        assert set(from_browser) <= set(from_api)
+
+    api, browser = sum(api_ms) / len(api_ms), sum(browser_ms) / len(browser_ms)
+    print(
+        f"{len(ASHBY_BENCH_URLS)} jobs: api {api:.0f} ms/job, "
+        f"browser {browser:.0f} ms/job ({browser / api:.1f}x)"
+    )
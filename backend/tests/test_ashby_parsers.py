@@ -0,0 +1,85 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+from scrapers.sites.ashby import Ashby
+
+from schemas.definitions import Job
+
+FIXTURES = Path(__file__).parent / "fixtures" / "ashby"
+
+
+@pytest.fixture
+def ashby():
+    return Ashby(
+        Job(
+            jobspy_id="li-4012345678",
+            title="Software Engineer",
+            company="Example",
+            direct_job_url="https://jobs.ashbyhq.com/example/6f0d1a52-8c4e-4b1a-9d3e-2a7c5b9e1f04",
+        )
+    )
+
+
+@pytest.fixture
+def form():
+    posting = json.loads((FIXTURES / "posting.json").read_text())
+    return posting["data"]["jobPosting"]["applicationForm"]
+
+
+@pytest.fixture
+def html():
+    return (FIXTURES / "application.html").read_text()
+
+
+def test_parsers_agree(ashby, form, html):
+    from_api = ashby.parse_form_definition(form)
+    from_html = ashby.parse_questions(html)
+
+    assert from_api.job_id == from_html.job_id
+    assert from_api.url == from_html.url
+    assert from_api.fields == from_html.fields
+
+
+def test_required_marker_is_stripped(ashby, html):
+    questions = ashby.parse_questions(html).get_questions()
+
+    assert questions[:3] == ["Name", "Email", "Resume"]
+    assert not any(q.endswith("*") for q in questions)
+
+
+def test_checkbox_choices_are_labels(ashby, form, html):
+    question = "Which languages have you used professionally?"
+    for app in (ashby.parse_form_definition(form), ashby.parse_questions(html)):
+        field = next(f for f in app.fields if f.question == question)
+        assert field.multiple_choice
+        assert field.choices == ["Python", "Go", "TypeScript"]
+
+
+def test_hidden_conditional_fields(ashby, form, html):
+    # the API lists conditional fields the rendered page hasn't revealed yet;
+    # every question apply() meets on the page must still be answerable
+    form = copy.deepcopy(form)
+    form["sections"][1]["fieldEntries"].insert(
+        3,
+        {
+            "isRequired": False,
+            "field": {
+                "path": "5e1b7c08-visa",
+                "title": "Please describe your visa status",
+                "type": "LongText",
+            },
+        },
+    )
+    from_api = ashby.parse_form_definition(form)
+    from_html = ashby.parse_questions(html)
+
+    for i, field in enumerate(from_api.fields):
+        field.answer = str(i)
+    for field in from_html.fields:
+        assert from_api.find_answer(field.question) is not None
+
+    # page order is preserved, so the API fields are a supersequence
+    remaining = iter(from_api.get_questions())
+    assert all(q in remaining for q in from_html.get_questions())
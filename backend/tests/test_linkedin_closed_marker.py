@@ -0,0 +1,24 @@
+from pathlib import Path
+
+import pytest
+from scrapers.sites.linkedin import scan_for_closed_marker
+
+FIXTURES = Path(__file__).parent / "fixtures" / "linkedin"
+
+
+def chunks(data: bytes, size: int):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize(
+    ("fixture", "closed"),
+    [
+        ("closed.html", True),
+        ("closed_single_quoted.html", True),
+        ("open.html", False),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 16])
+def test_closed_marker(fixture, closed, chunk_size):
+    html = (FIXTURES / fixture).read_bytes()
+    assert scan_for_closed_marker(chunks(html, chunk_size)) is closed
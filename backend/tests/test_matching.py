@@ -0,0 +1,34 @@
+import pytest
+from core.matching import get_common_question_matcher
+
+from schemas.definitions import User
+
+
+@pytest.fixture
+def matcher():
+    return get_common_question_matcher(
+        User(
+            first_name="Ada",
+            last_name="Lovelace",
+            email="ada@example.com",
+            linkedin_url="https://www.linkedin.com/in/ada",
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    ("question", "keyword", "answer"),
+    [
+        ("First name", "first name", "Ada"),
+        ("Last name", "last name", "Lovelace"),
+        ("Full name", "name", "Ada Lovelace"),
+        ("LinkedIn profile", "linkedin", "https://www.linkedin.com/in/ada"),
+    ],
+)
+def test_matches_profile_question(matcher, question, keyword, answer):
+    assert matcher.match(question) == keyword
+    assert matcher.answers[keyword] == answer
+
+
+def test_no_match(matcher):
+    assert matcher.match("Why do you want to work here?") is None
@@ -0,0 +1,88 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from core import jobs
+
+from schemas.definitions import App, AppField, Job, User
+
+
+@pytest.fixture
+def app():
+    return App(
+        job_id=Job(jobspy_id="li-1", title="Engineer", company="Example").id,
+        fields=[
+            AppField(question="Why us?", multiple_choice=False),
+            AppField(
+                question="Open to relocation?",
+                multiple_choice=True,
+                choices=["Yes", "No"],
+            ),
+        ],
+    )
+
+
+@pytest.fixture
+def stub_prepare(monkeypatch):
+    per_question = []
+
+    def answer_question(field, job, app, user, *, resume_file_id, examples):
+        per_question.append(field.question)
+        return SimpleNamespace(output_text=f" answer to {field.question} ")
+
+    monkeypatch.setattr(
+        jobs,
+        "get_common_question_matcher",
+        lambda user: SimpleNamespace(match=lambda question: None, answers={}),
+    )
+    monkeypatch.setattr(jobs, "upload_resume", lambda path: "file-resume")
+    monkeypatch.setattr(jobs, "profile_hash", lambda user: "profile")
+    monkeypatch.setattr(
+        jobs, "get_cached_answers", lambda fields, job, user_hash: [None] * len(fields)
+    )
+    monkeypatch.setattr(jobs, "store_answers", lambda fields, job, user_hash: None)
+    monkeypatch.setattr(jobs, "answer_question", answer_question)
+    return per_question
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        json.JSONDecodeError("Expecting value", "", 0),
+        AttributeError("'list' object has no attribute 'get'"),
+        RuntimeError("API error"),
+    ],
+)
+def test_batch_failure_falls_back_to_per_question(
+    monkeypatch, stub_prepare, app, error
+):
+    def answer_questions(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(jobs, "answer_questions", answer_questions)
+    job = Job(id=app.job_id, jobspy_id="li-1", title="Engineer", company="Example")
+
+    prepared = jobs.prepare_job_app(
+        job, app, User.model_construct(resume_pdf_path="resume.pdf"), mode="batch"
+    )
+
+    assert stub_prepare == ["Why us?", "Open to relocation?"]
+    assert [f.answer for f in prepared.fields] == [
+        "answer to Why us?",
+        "answer to Open to relocation?",
+    ]
+
+
+def test_batch_answers_skip_per_question(monkeypatch, stub_prepare, app):
+    monkeypatch.setattr(
+        jobs, "answer_questions", lambda fields, *args, **kwargs: ["Mission", None]
+    )
+    job = Job(id=app.job_id, jobspy_id="li-1", title="Engineer", company="Example")
+
+    prepared = jobs.prepare_job_app(
+        job, app, User.model_construct(resume_pdf_path="resume.pdf"), mode="batch"
+    )
+
+    # only the question the batch left invalid is answered individually
+    assert stub_prepare == ["Open to relocation?"]
+    assert prepared.fields[0].answer == "Mission"
@@ -0,0 +1,72 @@
+import random
+
+import pandas as pd
+import pytest
+from core.jobs import _preprocess_jobspy_listing, _preprocess_jobspy_listings
+
+ROWS = 10_000
+
+
+def listings_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A jobspy-shaped frame mixing real values, NaN/NaT and string placeholders."""
+    rng = random.Random(seed)
+    placeholders = ["", " ", "None", "nan", "NaT", "null", None, float("nan")]
+
+    def text(value):
+        return rng.choice(placeholders) if rng.random() < 0.2 else value
+
+    def url(i):
+        base = f"https://www.linkedin.com/jobs/view/{i}"
+        return text(rng.choice([base, f"{base}?trk=abc&x=1", f"{base}&refId=2"]))
+
+    return pd.DataFrame(
+        {
+            "id": [f"li-{i}" for i in range(rows)],
+            "title": [text(f"Engineer {i}") for i in range(rows)],
+            "company": [text(f"Company {i % 50}") for i in range(rows)],
+            "location": [text("New York, NY") for _ in range(rows)],
+            "min_amount": [
+                float("nan") if rng.random() < 0.3 else rng.randint(50, 150) * 1000.0
+                for _ in range(rows)
+            ],
+            "max_amount": [
+                float("nan") if rng.random() < 0.3 else rng.randint(150, 300) * 1000.0
+                for _ in range(rows)
+            ],
+            "date_posted": pd.to_datetime(
+                [
+                    (
+                        pd.NaT
+                        if rng.random() < 0.1
+                        else f"2026-10-{rng.randint(1, 16):02d}"
+                    )
+                    for _ in range(rows)
+                ]
+            ),
+            "job_type": [
+                text(rng.choice(["fulltime", "contract"])) for _ in range(rows)
+            ],
+            "job_url": [url(i) for i in range(rows)],
+            "job_url_direct": [url(i) for i in range(rows)],
+            "description": [text(f"Description {i}") for i in range(rows)],
+        }
+    )
+
+
+def per_row(listings: pd.DataFrame) -> list[dict]:
+    return [_preprocess_jobspy_listing(row.to_dict()) for _, row in listings.iterrows()]
+
+
+def typed(records: list[dict]) -> list[dict]:
+    return [{k: (type(v), v) for k, v in record.items()} for record in records]
+
+
+def test_matches_per_row_preprocessing():
+    listings = listings_frame(ROWS)
+    assert typed(_preprocess_jobspy_listings(listings)) == typed(per_row(listings))
+
+
+@pytest.mark.parametrize("missing", ["job_url_direct", "min_amount", "date_posted"])
+def test_matches_per_row_preprocessing_with_missing_column(missing):
+    listings = listings_frame(500, seed=1).drop(columns=[missing])
+    assert typed(_preprocess_jobspy_listings(listings)) == typed(per_row(listings))
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from db.models import JobORM
+from db.utils.queries import get_approved_jobs_without_app
+
+
+@pytest.fixture
+def session(pg_engine):
+    with Session(pg_engine) as db_session:
+        db_session.execute(
+            insert(JobORM),
+            [
+                {
+                    "jobspy_id": f"li-{i}",
+                    "title": "Engineer",
+                    "company": "Example",
+                    "reviewed": i % 10 < 8,
+                    "approved": i % 100 == 0,
+                    "discarded": i % 7 == 0,
+                }
+                for i in range(5000)
+            ],
+        )
+        db_session.commit()
+        db_session.connection().exec_driver_sql("ANALYZE jobs")
+        yield db_session
+
+
+def test_approved_jobs_without_app_uses_partial_index(session):
+    executed = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        get_approved_jobs_without_app(session)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = executed[-1]
+    rows = session.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    plan = "\n".join(row[0] for row in rows)
+    assert "ix_jobs_approved" in plan, plan
@@ -0,0 +1,207 @@
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from core import llm
+from openai import NotFoundError
+from worker import tasks
+
+from schemas.definitions import Job, User
+
+
+class StubFiles:
+    def __init__(self, contents: dict[str, str] | None = None):
+        self.created = []
+        self.contents = contents or {}
+
+    def create(self, file, purpose):
+        self.created.append((file, purpose))
+        return SimpleNamespace(id="file-batch-input")
+
+    def content(self, file_id):
+        return SimpleNamespace(text=self.contents[file_id])
+
+
+class StubBatches:
+    def __init__(self, batch=None):
+        self.created = []
+        self.batch = batch
+
+    def create(self, **kwargs):
+        self.created.append(kwargs)
+        return SimpleNamespace(id="batch_123")
+
+    def retrieve(self, batch_id):
+        return self.batch
+
+
+def _result_line(job_id: str, status_code: int = 200, text: str = "") -> str:
+    body = {
+        "output": [
+            {"type": "message", "content": [{"type": "output_text", "text": text}]}
+        ],
+        "usage": {"input_tokens": 100, "input_tokens_details": {"cached_tokens": 80}},
+    }
+    return json.dumps(
+        {
+            "custom_id": job_id,
+            "response": {"status_code": status_code, "body": body},
+        }
+    )
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    usage = []
+    monkeypatch.setattr(llm, "upload_resume", lambda path: "file-resume")
+    monkeypatch.setattr(llm, "get_prompt", lambda name: "Review the job.")
+    monkeypatch.setattr(
+        llm, "record_llm_usage", lambda call_site, u: usage.append((call_site, u))
+    )
+    return usage
+
+
+@pytest.fixture
+def jobs():
+    return [
+        Job(jobspy_id=f"li-{i}", title="Engineer", company="Example", description=d)
+        for i, d in enumerate(["Build things.", "Fix things."])
+    ]
+
+
+@pytest.fixture
+def user():
+    return User.model_construct(resume_pdf_path="resume.pdf")
+
+
+def test_submit_review_batch(monkeypatch, stub_llm, jobs, user):
+    client = SimpleNamespace(files=StubFiles(), batches=StubBatches())
+    monkeypatch.setattr(llm, "client", client)
+
+    assert llm.submit_review_batch(jobs, user) == "batch_123"
+
+    ((file, purpose),) = client.files.created
+    assert purpose == "batch"
+    requests = [json.loads(line) for line in file[1].decode().splitlines()]
+    assert [r["custom_id"] for r in requests] == [str(job.id) for job in jobs]
+    for request, job in zip(requests, jobs):
+        assert request["url"] == "/v1/responses"
+        assert request["body"]["prompt_cache_key"] == "review:file-resume"
+        assert request["body"]["input"][-1] == {
+            "role": "user",
+            "content": job.description,
+        }
+
+    assert client.batches.created == [
+        {
+            "input_file_id": "file-batch-input",
+            "endpoint": "/v1/responses",
+            "completion_window": "24h",
+        }
+    ]
+
+
+def test_review_batch_results_while_running(monkeypatch, stub_llm):
+    batch = SimpleNamespace(status="in_progress", output_file_id=None)
+    monkeypatch.setattr(
+        llm, "client", SimpleNamespace(files=StubFiles(), batches=StubBatches(batch))
+    )
+
+    assert llm.get_review_batch_results("batch_123") == ("in_progress", None)
+
+
+def test_review_batch_results(monkeypatch, stub_llm):
+    review = json.dumps({"action": "apply", "classification": "target"})
+    output = "\n".join(
+        [
+            _result_line("job-ok", text=review),
+            _result_line("job-failed", status_code=500),
+            _result_line("job-unparsable", text="not json"),
+            "",
+        ]
+    )
+    batch = SimpleNamespace(status="completed", output_file_id="file-output")
+    monkeypatch.setattr(
+        llm,
+        "client",
+        SimpleNamespace(
+            files=StubFiles({"file-output": output}), batches=StubBatches(batch)
+        ),
+    )
+
+    status, reviews = llm.get_review_batch_results("batch_123")
+
+    assert status == "completed"
+    assert list(reviews) == ["job-ok"]
+    assert reviews["job-ok"].action == "apply"
+    assert reviews["job-ok"].classification == "target"
+    assert [call_site for call_site, _ in stub_llm] == ["review_batch"] * 2
+
+
+@pytest.fixture
+def poll(monkeypatch):
+    calls = {"released": [], "rescheduled": []}
+    monkeypatch.setattr(
+        tasks,
+        "_clear_review_claims",
+        lambda job_ids, claim_token=None: calls["released"].append(job_ids),
+    )
+    monkeypatch.setattr(
+        tasks.poll_review_batch_task,
+        "apply_async",
+        lambda args, countdown: calls["rescheduled"].append(args),
+    )
+    return calls
+
+
+def test_poll_retries_then_releases_claims(monkeypatch, poll):
+    def fail(batch_id):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(tasks, "get_review_batch_results", fail)
+
+    with pytest.raises(Exception):
+        tasks.poll_review_batch_task("batch_123", ["job-1"], "tok", 0.0)
+    assert poll["rescheduled"] == [("batch_123", ["job-1"], "tok", 0.0, 1)]
+    assert poll["released"] == []
+
+    with pytest.raises(Exception):
+        tasks.poll_review_batch_task(
+            "batch_123", ["job-1"], "tok", 0.0, tasks.REVIEW_BATCH_MAX_POLL_ERRORS - 1
+        )
+    assert len(poll["rescheduled"]) == 1
+    assert poll["released"] == [["job-1"]]
+
+
+def test_poll_releases_claims_on_unknown_batch(monkeypatch, poll):
+    def not_found(batch_id):
+        request = httpx.Request("GET", f"https://api.openai.com/v1/batches/{batch_id}")
+        raise NotFoundError(
+            "No batch found",
+            response=httpx.Response(404, request=request),
+            body=None,
+        )
+
+    monkeypatch.setattr(tasks, "get_review_batch_results", not_found)
+
+    with pytest.raises(Exception):
+        tasks.poll_review_batch_task("batch_123", ["job-1"], "tok", 0.0)
+    assert poll["rescheduled"] == []
+    assert poll["released"] == [["job-1"]]
+
+
+def test_poll_releases_claims_past_lease(monkeypatch, poll):
+    monkeypatch.setattr(
+        tasks, "get_review_batch_results", lambda batch_id: ("in_progress", None)
+    )
+    monkeypatch.setattr(tasks.time, "time", lambda: 1_000_000.0)
+
+    fresh = 1_000_000.0 - 60
+    assert tasks.poll_review_batch_task("batch_123", ["job-1"], "tok", fresh) is None
+    assert poll["rescheduled"] == [("batch_123", ["job-1"], "tok", fresh, 0)]
+
+    stale = 1_000_000.0 - tasks.REVIEW_BATCH_LEASE_SECONDS - 1
+    assert tasks.poll_review_batch_task("batch_123", ["job-1"], "tok", stale) is None
+    assert len(poll["rescheduled"]) == 1
+    assert poll["released"] == [["job-1"]]